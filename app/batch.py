@@ -0,0 +1,237 @@
+"""Offline batch fallacy detection.
+
+Streams transcripts from JSONL ({"id": ..., "text": ...} per line) or plain
+text (one transcript per line), analyzes them with bounded concurrency
+across one or more model backends, and appends results to a JSONL file.
+
+The output file doubles as the checkpoint: rerunning the same command skips
+every ID already written, so an interrupted run resumes where it stopped.
+Items that fail are appended to <output>.errors.jsonl and retried on the
+next run.
+
+    python -m app.batch transcripts.jsonl -o results.jsonl --concurrency 8 \\
+        --backend http://gpu1:11434 --backend http://gpu2:11434
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO
+
+from app.fallacy_detector import FallacyDetector
+
+
+def iter_items(stream: TextIO, jsonl: bool) -> Iterator[Dict[str, str]]:
+    """Yield {"id", "text"} items; IDs default to the 1-based line number"""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if jsonl:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping line {line_number}: invalid JSON", file=sys.stderr)
+                continue
+            text = record.get("text") if isinstance(record, dict) else None
+            if not isinstance(text, str) or not text.strip():
+                print(f"Skipping line {line_number}: missing text", file=sys.stderr)
+                continue
+            item_id = record.get("id", line_number)
+        else:
+            text, item_id = line, line_number
+        yield {"id": str(item_id), "text": text}
+
+
+def load_checkpoint(output_path: str) -> Set[str]:
+    """Return IDs already written to the output, dropping a torn final line
+
+    Blank lines are ignored and corrupt lines in the middle of the file are
+    skipped (their items are redone); only an unparseable last line without
+    a newline, left by a run that died mid-write, is truncated away.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    offset = 0
+    torn_at = None
+    with open(output_path, "rb") as f:
+        for line_number, raw in enumerate(f, start=1):
+            if raw.strip():
+                try:
+                    done.add(str(json.loads(raw)["id"]))
+                except (ValueError, KeyError, TypeError):
+                    if raw.endswith(b"\n"):
+                        print(f"Ignoring corrupt line {line_number} in {output_path}", file=sys.stderr)
+                    else:
+                        torn_at = offset
+            offset += len(raw)
+    if torn_at is not None:
+        # The previous run died mid-write; drop the partial line so appends stay valid
+        with open(output_path, "r+b") as f:
+            f.truncate(torn_at)
+    if os.path.getsize(output_path) and not _ends_with_newline(output_path):
+        with open(output_path, "ab") as f:
+            f.write(b"\n")
+    return done
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def count_items(path: str) -> Optional[int]:
+    """Count non-empty input lines for the ETA; None for stdin"""
+    if path == "-":
+        return None
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+class Progress:
+    """Throughput and ETA printed to stderr at most once per second"""
+
+    def __init__(self, total: Optional[int], skipped: int):
+        self.total = total
+        self.skipped = skipped
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._last_print = 0.0
+
+    def update(self, failed: bool = False) -> None:
+        if failed:
+            self.failed += 1
+        else:
+            self.done += 1
+        now = time.monotonic()
+        if now - self._last_print >= 1.0:
+            self._last_print = now
+            print(f"\r{self.render()}", end="", file=sys.stderr, flush=True)
+
+    def finish(self) -> None:
+        print(f"\r{self.render()}", file=sys.stderr, flush=True)
+
+    def render(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        processed = self.done + self.failed
+        rate = processed / elapsed
+        line = f"{self.done} done, {self.failed} failed, {self.skipped} skipped | {rate:.2f} items/s"
+        if self.total is not None:
+            remaining = max(self.total - self.skipped - processed, 0)
+            eta = remaining / rate if rate > 0 else 0
+            line += f" | {processed + self.skipped}/{self.total} | ETA {int(eta // 60):02d}:{int(eta % 60):02d}"
+        return line
+
+
+def result_record(item: Dict[str, str], result: Dict[str, Any], backend: str,
+                  duration: float) -> Dict[str, Any]:
+    """Serialize a detector result for the output file"""
+    return {
+        "id": item["id"],
+        "has_fallacies": result.get("has_fallacies", False),
+        "fallacies": [
+            f.model_dump() if hasattr(f, "model_dump") else f for f in result.get("fallacies", [])
+        ],
+        "confidence": result.get("confidence", 0.0),
+        "analysis": result.get("analysis", ""),
+        "backend": backend,
+        "duration": round(duration, 3)
+    }
+
+
+async def run_batch(items: Iterator[Dict[str, str]], detectors: List[FallacyDetector],
+                    output: TextIO, errors: TextIO, concurrency: int, skip: Set[str],
+                    progress: Progress) -> None:
+    """Analyze items with `concurrency` workers, spreading items round-robin over the detectors"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    # Chosen per item rather than per worker so every backend is used even
+    # when there are fewer workers than backends
+    backends = itertools.cycle(detectors)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            detector = next(backends)
+            started = time.monotonic()
+            try:
+                result = await detector.detect_fallacies(item["text"])
+            except Exception as e:
+                result = {"error": str(e)}
+            if result.get("error"):
+                errors.write(json.dumps({"id": item["id"], "error": result["error"],
+                                         "backend": detector.api_base}) + "\n")
+                errors.flush()
+                progress.update(failed=True)
+            else:
+                record = result_record(item, result, detector.api_base, time.monotonic() - started)
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                progress.update()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    seen = set(skip)
+    for item in items:
+        if item["id"] in seen:
+            continue
+        seen.add(item["id"])
+        await queue.put(item)
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run fallacy detection over a file of transcripts")
+    parser.add_argument("input", help="Input .jsonl ({\"id\", \"text\"} per line) or text file; - for stdin")
+    parser.add_argument("-o", "--output", required=True, help="Output JSONL file (also the resume checkpoint)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Concurrent requests in flight")
+    parser.add_argument("--backend", action="append", dest="backends",
+                        help="Model API base URL; repeat to spread load (default: LOCAL_API_BASE)")
+    parser.add_argument("--model", help="Model name (default: LOCAL_MODEL_NAME)")
+    parser.add_argument("--format", choices=["jsonl", "text"],
+                        help="Input format (default: from the file extension)")
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    jsonl = args.format == "jsonl" if args.format else args.input.endswith(".jsonl")
+    detectors = [FallacyDetector(api_base=url, model_name=args.model) for url in (args.backends or [None])]
+
+    done = load_checkpoint(args.output)
+    total = count_items(args.input)
+    progress = Progress(total, skipped=len(done) if total is None else min(len(done), total))
+    if done:
+        print(f"Resuming: {len(done)} item(s) already in {args.output}", file=sys.stderr)
+
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        with open(args.output, "a", encoding="utf-8") as output, \
+                open(f"{args.output}.errors.jsonl", "a", encoding="utf-8") as errors:
+            asyncio.run(run_batch(iter_items(stream, jsonl), detectors, output, errors,
+                                  args.concurrency, done, progress))
+    except KeyboardInterrupt:
+        print("\nInterrupted; rerun the same command to resume", file=sys.stderr)
+        return 130
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    progress.finish()
+    if progress.failed:
+        print(f"{progress.failed} item(s) failed (see {args.output}.errors.jsonl); "
+              f"rerun to retry them", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
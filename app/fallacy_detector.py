@@ -1,15 +1,43 @@
 import os
 import json
+import time
 import httpx
-from typing import Dict, List, Any
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+from pydantic import ValidationError
+from app.json_repair import repair_json, strip_code_fences
+from app.logging_config import get_logger, log_event
 from app.models import Fallacy, FallacyDetectionResult
 
+logger = get_logger(__name__)
+
 class FallacyDetector:
-    def __init__(self):
+    def __init__(self, api_base: Optional[str] = None, model_name: Optional[str] = None):
         # Support for local models via Ollama or other local API endpoints
-        self.api_base = os.getenv("LOCAL_API_BASE", "http://localhost:11434")
-        self.model_name = os.getenv("LOCAL_MODEL_NAME", "llama3.2")
+        self.api_base = api_base or os.getenv("LOCAL_API_BASE", "http://localhost:11434")
+        self.model_name = model_name or os.getenv("LOCAL_MODEL_NAME", "llama3.2")
         self.use_ollama = os.getenv("USE_OLLAMA", "true").lower() == "true"
+        # How long Ollama should keep the model resident after a request
+        self.keep_alive = os.getenv("MODEL_KEEP_ALIVE", "30m")
+        # Readiness: the backend must answer a warm-up within this many seconds
+        self.ready_latency_budget = float(os.getenv("READY_LATENCY_BUDGET", "5.0"))
+        self.ready = False
+        self.last_warmup_at = None
+        self.last_warmup_latency = None
+        self.last_warmup_error = None
+        # A detection that succeeded within this many seconds also proves the
+        # model is loaded, so a warm-up queued behind real work cannot fail readiness
+        self.ready_success_window = float(os.getenv("READY_SUCCESS_WINDOW", "120"))
+        self.last_success_at = None
+        # Constrain generation to the FallacyDetectionResult schema; set
+        # JSON_SCHEMA_OUTPUT=false for servers that only support plain JSON mode
+        self.use_json_schema = os.getenv("JSON_SCHEMA_OUTPUT", "true").lower() == "true"
+        self.response_schema = FallacyDetectionResult.model_json_schema()
+        # Re-ask the model only when its output cannot be repaired
+        self.json_max_retries = int(os.getenv("JSON_MAX_RETRIES", "1"))
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "parse_failures": 0, "repaired": 0, "retries": 0, "unrecoverable": 0}
         self.fallacy_types = {
             "ad_hominem": "Attacking the person instead of their argument",
             "strawman": "Misrepresenting someone's argument to make it easier to attack",
@@ -27,6 +55,170 @@ class FallacyDetector:
             "equivocation": "Using ambiguous language to mislead"
         }
     
+    async def warm_up(self) -> Dict[str, Any]:
+        """Load the model into memory with a tiny generation and update readiness"""
+        started = time.monotonic()
+        try:
+            async with httpx.AsyncClient(timeout=120.0) as client:
+                if self.use_ollama:
+                    response = await client.post(
+                        f"{self.api_base}/api/generate",
+                        json={
+                            "model": self.model_name,
+                            "prompt": "ping",
+                            "stream": False,
+                            "keep_alive": self.keep_alive,
+                            "options": {"num_predict": 1}
+                        }
+                    )
+                else:
+                    response = await client.post(
+                        f"{self.api_base}/v1/chat/completions",
+                        json={
+                            "model": self.model_name,
+                            "messages": [{"role": "user", "content": "ping"}],
+                            "max_tokens": 1
+                        }
+                    )
+                response.raise_for_status()
+        except Exception as e:
+            self.ready = False
+            self.last_warmup_error = str(e) or e.__class__.__name__
+            self.last_warmup_latency = None
+            self.last_warmup_at = time.time()
+            return self.readiness()
+
+        latency = time.monotonic() - started
+        self.last_warmup_latency = latency
+        self.last_warmup_at = time.time()
+        if latency <= self.ready_latency_budget:
+            self.ready = True
+            self.last_warmup_error = None
+        else:
+            self.ready = False
+            self.last_warmup_error = (
+                f"Warm-up took {latency:.2f}s, over the {self.ready_latency_budget:.2f}s budget"
+            )
+        return self.readiness()
+
+    def readiness(self) -> Dict[str, Any]:
+        """Report whether the model backend has recently answered within budget"""
+        recent_success = (
+            self.last_success_at is not None
+            and time.time() - self.last_success_at <= self.ready_success_window
+        )
+        return {
+            "ready": self.ready or recent_success,
+            "model": self.model_name,
+            "latency": self.last_warmup_latency,
+            "latency_budget": self.ready_latency_budget,
+            "checked_at": self.last_warmup_at,
+            "error": self.last_warmup_error,
+            "last_success_at": self.last_success_at
+        }
+
+    async def _call_model(self, system_prompt: str, user_prompt: str) -> str:
+        """Send one chat request, constraining the output to the result schema"""
+        if self.use_ollama:
+            # Use Ollama API
+            try:
+                async with httpx.AsyncClient(timeout=60.0) as client:
+                    payload = {
+                        "model": self.model_name,
+                        "messages": [
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        "stream": False,
+                        "keep_alive": self.keep_alive,
+                        "format": self.response_schema if self.use_json_schema else "json",
+                        "options": {
+                            "temperature": 0.3,
+                        }
+                    }
+                    response = await client.post(f"{self.api_base}/api/chat", json=payload)
+                    response.raise_for_status()
+                    result_data = response.json()
+                    return result_data.get("message", {}).get("content", "")
+            except httpx.ConnectError:
+                raise Exception(f"Could not connect to Ollama at {self.api_base}. Is Ollama running?")
+            except httpx.HTTPStatusError as e:
+                raise Exception(f"Ollama API error: {e.response.status_code} - {e.response.text}")
+            except Exception as e:
+                raise Exception(f"Error calling Ollama: {str(e)}")
+        else:
+            # Use OpenAI-compatible API endpoint
+            if self.use_json_schema:
+                response_format = {
+                    "type": "json_schema",
+                    "json_schema": {"name": "fallacy_detection_result", "schema": self.response_schema}
+                }
+            else:
+                response_format = {"type": "json_object"}
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                response = await client.post(
+                    f"{self.api_base}/v1/chat/completions",
+                    json={
+                        "model": self.model_name,
+                        "messages": [
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        "temperature": 0.3,
+                        "response_format": response_format
+                    }
+                )
+                response.raise_for_status()
+                result_data = response.json()
+                return result_data.get("choices", [{}])[0].get("message", {}).get("content", "")
+
+    def _parse_response(self, result_text: str) -> Optional[Dict[str, Any]]:
+        """Parse the model's JSON, repairing fenced or truncated output; None if unusable"""
+        # Well-formed output is the common case; only strip fences when it fails
+        for candidate in (result_text.strip(), strip_code_fences(result_text)):
+            try:
+                parsed = json.loads(candidate)
+                if isinstance(parsed, dict):
+                    return parsed
+            except json.JSONDecodeError:
+                pass
+        
+        self._count("parse_failures")
+        try:
+            parsed = repair_json(result_text)
+        except ValueError as e:
+            log_event(logger, "json_repair_failed", level=logging.WARNING,
+                      error=str(e), response=result_text[:200])
+            return None
+        if not isinstance(parsed, dict):
+            return None
+        self._count("repaired")
+        # Truncation can leave the last entry with only some of its fields
+        if isinstance(parsed.get("fallacies"), list):
+            parsed["fallacies"] = [f for f in parsed["fallacies"] if self._is_complete_fallacy(f)]
+        return parsed
+
+    @staticmethod
+    def _is_complete_fallacy(data: Any) -> bool:
+        try:
+            Fallacy.model_validate(data)
+        except ValidationError:
+            return False
+        return True
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def parse_stats(self) -> Dict[str, Any]:
+        """Counters and rates for malformed model output and retries"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        requests = stats["requests"] or 1
+        stats["parse_failure_rate"] = stats["parse_failures"] / requests
+        stats["retry_rate"] = stats["retries"] / requests
+        return stats
+
     async def detect_fallacies(self, text: str) -> Dict[str, Any]:
         """Detect fallacies in the given text using local model API"""
         if not text or len(text.strip()) < 10:
@@ -36,6 +228,8 @@ class FallacyDetector:
                 "confidence": 0.0
             }
         
+        started = time.monotonic()
+        self._count("requests")
         try:
             # Create prompt for fallacy detection
             system_prompt = """You are an expert at detecting logical fallacies and factual errors in text. 
@@ -71,75 +265,31 @@ IMPORTANT: You must respond ONLY with valid JSON, no other text."""
     "analysis": "Brief overall analysis"
 }}"""
 
-            if self.use_ollama:
-                # Use Ollama API
-                try:
-                    async with httpx.AsyncClient(timeout=60.0) as client:
-                        response = await client.post(
-                            f"{self.api_base}/api/chat",
-                            json={
-                                "model": self.model_name,
-                                "messages": [
-                                    {"role": "system", "content": system_prompt},
-                                    {"role": "user", "content": user_prompt}
-                                ],
-                                "stream": False,
-                                "options": {
-                                    "temperature": 0.3,
-                                }
-                            }
-                        )
-                        response.raise_for_status()
-                        result_data = response.json()
-                        result_text = result_data.get("message", {}).get("content", "")
-                except httpx.ConnectError:
-                    raise Exception(f"Could not connect to Ollama at {self.api_base}. Is Ollama running?")
-                except httpx.HTTPStatusError as e:
-                    raise Exception(f"Ollama API error: {e.response.status_code} - {e.response.text}")
-                except Exception as e:
-                    raise Exception(f"Error calling Ollama: {str(e)}")
-            else:
-                # Use OpenAI-compatible API endpoint
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    response = await client.post(
-                        f"{self.api_base}/v1/chat/completions",
-                        json={
-                            "model": self.model_name,
-                            "messages": [
-                                {"role": "system", "content": system_prompt},
-                                {"role": "user", "content": user_prompt}
-                            ],
-                            "temperature": 0.3,
-                            "response_format": {"type": "json_object"}
-                        }
-                    )
-                    response.raise_for_status()
-                    result_data = response.json()
-                    result_text = result_data.get("choices", [{}])[0].get("message", {}).get("content", "")
-            
-            # Handle empty response
-            if not result_text or not result_text.strip():
-                raise Exception("Empty response from model. Ollama may not be running or the model may not be available.")
-            
-            # Clean up the response - remove markdown code blocks if present
-            result_text = result_text.strip()
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            elif result_text.startswith("```"):
-                result_text = result_text[3:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
+            detection_result = None
+            for attempt in range(self.json_max_retries + 1):
+                if attempt:
+                    self._count("retries")
+                    log_event(logger, "detection_retry", level=logging.WARNING, attempt=attempt)
+                result_text = await self._call_model(system_prompt, user_prompt)
+                
+                # Handle empty response
+                if not result_text or not result_text.strip():
+                    raise Exception("Empty response from model. Ollama may not be running or the model may not be available.")
+                
+                detection_result = self._parse_response(result_text)
+                if detection_result is not None:
+                    break
             
-            # Try to parse JSON
-            try:
-                detection_result = json.loads(result_text)
-            except json.JSONDecodeError as e:
-                raise Exception(f"Invalid JSON response from model: {str(e)}. Response: {result_text[:200]}")
+            if detection_result is None:
+                self._count("unrecoverable")
+                raise Exception(f"Invalid JSON response from model after {self.json_max_retries + 1} attempt(s). Response: {result_text[:200]}")
             
             # Parse and structure the results
             fallacies = []
-            for fallacy_data in detection_result.get("fallacies", []):
+            for fallacy_data in detection_result.get("fallacies") or []:
+                # Repaired output can end with a partial entry
+                if not isinstance(fallacy_data, dict) or not fallacy_data.get("type"):
+                    continue
                 # Safely convert confidence to float
                 confidence_val = fallacy_data.get("confidence", 0.0)
                 try:
@@ -166,6 +316,9 @@ IMPORTANT: You must respond ONLY with valid JSON, no other text."""
             except (ValueError, TypeError):
                 overall_confidence = 0.0
             
+            self.last_success_at = time.time()
+            log_event(logger, "detection_complete", duration=round(time.monotonic() - started, 3),
+                      fallacies=len(fallacies), model=self.model_name)
             return {
                 "has_fallacies": detection_result.get("has_fallacies", False),
                 "fallacies": fallacies,
@@ -174,7 +327,8 @@ IMPORTANT: You must respond ONLY with valid JSON, no other text."""
             }
             
         except Exception as e:
-            print(f"Error detecting fallacies: {e}")
+            log_event(logger, "detection_error", level=logging.ERROR,
+                      duration=round(time.monotonic() - started, 3), error=str(e))
             # Return empty result on error
             return {
                 "has_fallacies": False,
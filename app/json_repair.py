@@ -0,0 +1,105 @@
+import re
+import json
+from typing import Any, List, Tuple
+
+# The whole response is one code block; the closing fence may be cut off
+_FENCE_RE = re.compile(r"^\s*```(?:json)?[ \t]*\n?(.*?)(?:```)?\s*$", re.DOTALL | re.IGNORECASE)
+
+
+def strip_code_fences(text: str) -> str:
+    """Return the contents of a response that is a single markdown code block, or the text unchanged"""
+    match = _FENCE_RE.match(text)
+    return match.group(1).strip() if match else text.strip()
+
+
+def _scan(text: str) -> Tuple[str, str, List[Tuple[int, str]]]:
+    """Walk the text tracking open strings and brackets
+
+    Returns the text with trailing commas before closing brackets removed
+    (commas inside strings are left alone), the suffix that closes whatever
+    is still open, and the comma positions in the cleaned text with the
+    closers needed at each.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    cut_points: List[Tuple[int, str]] = []
+    in_string = False
+    escaped = False
+
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            out.append(char)
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            _drop_trailing_comma(out, cut_points)
+        elif char == ",":
+            cut_points.append((len(out), "".join(reversed(stack))))
+        out.append(char)
+
+    suffix = ""
+    if in_string:
+        suffix += "\\" if escaped else ""
+        suffix += '"'
+    return "".join(out), suffix + "".join(reversed(stack)), cut_points
+
+
+def _candidates(text: str) -> List[str]:
+    """Build closed-off variants of possibly truncated JSON, longest first
+
+    Besides the full text, every comma outside a string is a point where
+    everything before it is complete, so cutting there and closing the open
+    brackets gives valid JSON that drops only the unfinished tail.
+    """
+    cleaned, closers, cut_points = _scan(text)
+    candidates = [cleaned + closers]
+    candidates.extend(cleaned[:i] + closers for i, closers in reversed(cut_points))
+    return candidates
+
+
+def _drop_trailing_comma(out: List[str], cut_points: List[Tuple[int, str]]) -> None:
+    """Remove a comma (and the cut point at it) if only whitespace follows it in `out`"""
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i]
+        if cut_points and cut_points[-1][0] == i:
+            cut_points.pop()
+
+
+def repair_json(text: str) -> Any:
+    """Parse model output that may be fenced, padded with prose or truncated
+
+    Raises ValueError if no usable JSON object can be recovered.
+    """
+    text = strip_code_fences(text)
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found in response")
+    text = text[start:]
+
+    candidates = []
+    # Complete object followed by trailing prose (or a closing fence)
+    end = text.rfind("}")
+    if end != -1:
+        candidates.append(_scan(text[:end + 1])[0])
+    candidates.extend(_candidates(text))
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Could not repair JSON response")
@@ -0,0 +1,136 @@
+import os
+import json
+import uuid
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+import contextvars
+from typing import Dict, Optional
+
+# Trace ID of the message currently being handled; carried through
+# handle_message -> detect_fallacies -> emit and attached to every log record
+trace_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def new_trace_id() -> str:
+    """Generate a short random trace ID"""
+    return uuid.uuid4().hex[:16]
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "event=rate,event=rate" into a dict, ignoring malformed entries"""
+    rates = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        event, rate = item.split("=", 1)
+        try:
+            rates[event.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Drop a fraction of high-volume events; warnings and errors are always kept"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get()
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "event", None), 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as a single JSON line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None) or record.getMessage(),
+            "trace_id": getattr(record, "trace_id", None),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only render the traceback here; JSON formatting happens on the listener thread
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+def configure_logging() -> None:
+    """Route the app's loggers through a background queue writing JSON lines to stdout
+
+    LOG_LEVEL sets the level (default INFO) and LOG_SAMPLE_RATES keeps only a
+    fraction of chatty events, e.g. "ping=0.01,text_received=0.1".
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter())
+
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", "ping=0.01"))))
+
+    logger = logging.getLogger("app")
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    # Werkzeug logs every HTTP request (each long-polling packet) through its
+    # own synchronous handler; send it through the queue and keep only
+    # warnings unless ACCESS_LOG_LEVEL asks for more
+    werkzeug_logger = logging.getLogger("werkzeug")
+    werkzeug_logger.setLevel(os.getenv("ACCESS_LOG_LEVEL", "WARNING").upper())
+    werkzeug_logger.handlers = [queue_handler]
+    werkzeug_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger under the "app" hierarchy"""
+    return logging.getLogger(name if name.startswith("app") else f"app.{name}")
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO,
+              exc_info: bool = False, **fields) -> None:
+    """Log a named event with structured fields; cheap when the level is disabled"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, exc_info=exc_info, extra={"event": event, "fields": fields})
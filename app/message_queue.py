@@ -0,0 +1,80 @@
+import os
+import json
+import time
+from typing import Any, Dict, Optional
+
+import socketio
+
+
+class FileQueueManager(socketio.PubSubManager):
+    """Socket.IO pub/sub over an append-only file, for tests and local development
+
+    Lets a few worker processes on one host share emits and rooms without
+    running a broker. Every emit (including pongs) is appended and the file
+    is never compacted, and each worker polls and parses every line, so this
+    is not meant for production: use a real message queue such as redis://.
+    """
+
+    name = "file"
+
+    def __init__(self, path: str, channel: str = "flask-socketio", write_only: bool = False,
+                 logger=None, poll_interval: float = 0.01):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = path
+        self.poll_interval = poll_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        open(path, "ab").close()
+        # Only messages published after this manager was created are relevant
+        self._start_offset = os.path.getsize(path)
+
+    def _publish(self, data: Dict[str, Any]) -> None:
+        line = (json.dumps({"channel": self.channel, "message": data}) + "\n").encode()
+        # A single O_APPEND write keeps concurrent publishers from interleaving lines
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def _sleep(self) -> None:
+        if self.server is not None:
+            self.server.sleep(self.poll_interval)
+        else:
+            time.sleep(self.poll_interval)
+
+    def _listen(self):
+        with open(self.path, "rb") as f:
+            f.seek(self._start_offset)
+            pending = b""
+            while True:
+                chunk = f.readline()
+                if not chunk:
+                    self._sleep()
+                    continue
+                pending += chunk
+                if not pending.endswith(b"\n"):
+                    # Publisher is mid-write; wait for the rest of the line
+                    continue
+                line, pending = pending, b""
+                try:
+                    envelope = json.loads(line)
+                except ValueError:
+                    continue
+                if envelope.get("channel") == self.channel:
+                    yield envelope.get("message")
+
+
+def queue_options(url: Optional[str]) -> Dict[str, Any]:
+    """SocketIO keyword arguments for a SOCKETIO_MESSAGE_QUEUE URL
+
+    Unset or memory:// keeps the default in-process manager, file:///path uses
+    FileQueueManager (development only), and anything else (redis://, amqp://, kafka://, ...) is
+    handed to Flask-SocketIO's message_queue support.
+    """
+    if not url or url == "memory://":
+        return {}
+    if url.startswith("file://"):
+        return {"client_manager": FileQueueManager(url[len("file://"):])}
+    return {"message_queue": url}
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from typing import Dict, Any, Optional
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None if unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak RSS, in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+
+class SamplingProfiler:
+    """Periodically samples every thread's stack and aggregates folded stacks
+
+    The folded output ("frame;frame;frame count" per line) can be fed
+    directly to flamegraph.pl or loaded into speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, duration: float) -> Dict[str, Any]:
+        """Sample all threads for `duration` seconds; only one profile runs at a time"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            stacks = Counter()
+            samples = 0
+            own_thread = threading.get_ident()
+            thread_names = {}
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                if len(thread_names) != threading.active_count():
+                    thread_names = {t.ident: t.name for t in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stacks[self._fold(thread_names.get(thread_id, str(thread_id)), frame)] += 1
+                samples += 1
+                time.sleep(self.interval)
+            return {
+                "duration": duration,
+                "interval": self.interval,
+                "samples": samples,
+                "stacks": stacks,
+            }
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _fold(thread_name: str, frame) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(reversed(frames))
+
+    @staticmethod
+    def to_folded(stacks: Counter) -> str:
+        """Render aggregated stacks in the collapsed format used by flame graph tools"""
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
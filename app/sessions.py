@@ -0,0 +1,277 @@
+import json
+import time
+import threading
+from typing import Dict, Any, Callable, List, Optional, Set, TypeVar
+
+BROADCASTER = "broadcaster"
+VIEWER = "viewer"
+# Safety cap on fallacies kept for snapshots
+MAX_SNAPSHOT_FALLACIES = 100
+
+T = TypeVar("T")
+
+
+class AnalysisSession:
+    """One shared transcript: a single broadcaster, any number of read-only viewers"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.broadcaster: Optional[str] = None
+        self.viewers: Set[str] = set()
+        self.last_text = ""
+        # Handlers run concurrently, so several texts can be in flight at once
+        self.in_flight: Set[str] = set()
+        self.fallacies: List[Dict[str, Any]] = []
+        self.analyses = 0
+        self.updated_at: Optional[float] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.broadcaster is None and not self.viewers
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "broadcaster": self.broadcaster,
+            "viewers": sorted(self.viewers),
+            "last_text": self.last_text,
+            "in_flight": sorted(self.in_flight),
+            "fallacies": self.fallacies,
+            "analyses": self.analyses,
+            "updated_at": self.updated_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AnalysisSession":
+        session = cls(data["session_id"])
+        session.broadcaster = data.get("broadcaster")
+        session.viewers = set(data.get("viewers", []))
+        session.last_text = data.get("last_text", "")
+        session.in_flight = set(data.get("in_flight", []))
+        session.fallacies = data.get("fallacies", [])
+        session.analyses = data.get("analyses", 0)
+        session.updated_at = data.get("updated_at")
+        return session
+
+
+class SessionRegistry:
+    """Tracks room membership and accumulated results so each update is analyzed once
+
+    The latest result is kept per session so late joiners get a snapshot
+    instead of triggering re-analysis. Broadcasters send the growing
+    transcript, so the latest result covers everything said so far. State is
+    in-process (see RedisSessionRegistry for several workers); a session is
+    dropped once its last member leaves.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, AnalysisSession] = {}
+        self._members: Dict[str, str] = {}
+
+    # Storage: subclasses keep sessions elsewhere by overriding these
+
+    def _update(self, session_id: str, fn: Callable[[Optional[AnalysisSession]], T],
+                create: bool = False) -> T:
+        """Apply `fn` to a session atomically, saving it afterwards or dropping it once empty"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None and create:
+                session = AnalysisSession(session_id)
+            result = fn(session)
+            if session is not None:
+                if session.is_empty:
+                    self._sessions.pop(session_id, None)
+                else:
+                    self._sessions[session_id] = session
+            return result
+
+    def _get(self, session_id: str) -> Optional[AnalysisSession]:
+        """Copy of a session, safe to read without the lock"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return AnalysisSession.from_dict(session.to_dict()) if session else None
+
+    def _get_member(self, sid: str) -> Optional[str]:
+        with self._lock:
+            return self._members.get(sid)
+
+    def _set_member(self, sid: str, session_id: Optional[str]) -> None:
+        with self._lock:
+            if session_id is None:
+                self._members.pop(sid, None)
+            else:
+                self._members[sid] = session_id
+
+    # Operations
+
+    def join(self, session_id: str, sid: str, role: str) -> None:
+        """Add a client to a session; raises ValueError if the role is invalid or taken"""
+        if role not in (BROADCASTER, VIEWER):
+            raise ValueError(f"Unknown role: {role}")
+        if self._get_member(sid) not in (None, session_id):
+            self.leave(sid)
+
+        def add(session: AnalysisSession) -> None:
+            if role == BROADCASTER:
+                if session.broadcaster not in (None, sid):
+                    raise ValueError("Session already has a broadcaster")
+                session.viewers.discard(sid)
+                session.broadcaster = sid
+            else:
+                if session.broadcaster == sid:
+                    session.broadcaster = None
+                session.viewers.add(sid)
+
+        self._update(session_id, add, create=True)
+        self._set_member(sid, session_id)
+
+    def leave(self, sid: str) -> Optional[str]:
+        """Remove a client from its session; returns the session ID it left"""
+        session_id = self._get_member(sid)
+        if session_id is None:
+            return None
+        self._set_member(sid, None)
+
+        def remove(session: Optional[AnalysisSession]) -> None:
+            if session is None:
+                return
+            if session.broadcaster == sid:
+                session.broadcaster = None
+            session.viewers.discard(sid)
+
+        self._update(session_id, remove)
+        return session_id
+
+    def membership(self, sid: str) -> Optional[Dict[str, str]]:
+        """Return {"session_id", "role"} for a client, or None if not in a session"""
+        session_id = self._get_member(sid)
+        session = self._get(session_id) if session_id else None
+        if session is None:
+            return None
+        if session.broadcaster == sid:
+            return {"session_id": session.session_id, "role": BROADCASTER}
+        if sid in session.viewers:
+            return {"session_id": session.session_id, "role": VIEWER}
+        return None
+
+    def begin_analysis(self, session_id: str, text: str) -> bool:
+        """Claim an analysis of `text`; False if it was already analyzed or is in flight"""
+        def claim(session: Optional[AnalysisSession]) -> bool:
+            if session is None or text == session.last_text or text in session.in_flight:
+                return False
+            session.in_flight.add(text)
+            return True
+
+        return self._update(session_id, claim)
+
+    def record_result(self, session_id: str, text: str, fallacies: List[Dict[str, Any]]) -> bool:
+        """Store the result for `text` as the session's latest
+
+        Returns False, leaving the snapshot unchanged, when a newer result
+        for a transcript that extends `text` has already been recorded.
+        """
+        def record(session: Optional[AnalysisSession]) -> bool:
+            if session is None:
+                return False
+            session.in_flight.discard(text)
+            if session.last_text.startswith(text):
+                return False
+            session.last_text = text
+            session.fallacies = list(fallacies[:MAX_SNAPSHOT_FALLACIES])
+            session.analyses += 1
+            session.updated_at = time.time()
+            return True
+
+        return self._update(session_id, record)
+
+    def abandon_analysis(self, session_id: str, text: str) -> None:
+        """Release an in-flight claim after a failed analysis so it can be retried"""
+        def release(session: Optional[AnalysisSession]) -> None:
+            if session is not None:
+                session.in_flight.discard(text)
+
+        self._update(session_id, release)
+
+    def snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Compact summary of results so far for late joiners"""
+        session = self._get(session_id)
+        if session is None:
+            return None
+        return {
+            "type": "session_snapshot",
+            "session_id": session.session_id,
+            "text": session.last_text,
+            "fallacies": list(session.fallacies),
+            "has_fallacies": bool(session.fallacies),
+            "analyses": session.analyses,
+            "viewers": len(session.viewers),
+            "has_broadcaster": session.broadcaster is not None,
+            "updated_at": session.updated_at
+        }
+
+
+class RedisSessionRegistry(SessionRegistry):
+    """SessionRegistry stored in Redis so every worker process sees the same sessions
+
+    Each session is one JSON value updated with optimistic locking
+    (WATCH/MULTI), so concurrent updates from different workers never lose
+    each other's changes. Keys expire after `ttl` seconds without activity,
+    which cleans up after workers that died without their clients leaving.
+    """
+
+    def __init__(self, url: str, prefix: str = "hotmic:sessions", ttl: int = 24 * 3600, client=None):
+        super().__init__()
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.redis = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.prefix}:session:{session_id}"
+
+    def _member_key(self, sid: str) -> str:
+        return f"{self.prefix}:member:{sid}"
+
+    def _update(self, session_id: str, fn: Callable[[Optional[AnalysisSession]], T],
+                create: bool = False) -> T:
+        key = self._session_key(session_id)
+
+        def transaction(pipe) -> T:
+            raw = pipe.get(key)
+            session = AnalysisSession.from_dict(json.loads(raw)) if raw else None
+            if session is None and create:
+                session = AnalysisSession(session_id)
+            result = fn(session)
+            pipe.multi()
+            if session is not None:
+                if session.is_empty:
+                    pipe.delete(key)
+                else:
+                    pipe.set(key, json.dumps(session.to_dict()), ex=self.ttl)
+            return result
+
+        return self.redis.transaction(transaction, key, value_from_callable=True)
+
+    def _get(self, session_id: str) -> Optional[AnalysisSession]:
+        raw = self.redis.get(self._session_key(session_id))
+        return AnalysisSession.from_dict(json.loads(raw)) if raw else None
+
+    def _get_member(self, sid: str) -> Optional[str]:
+        raw = self.redis.get(self._member_key(sid))
+        return raw.decode() if isinstance(raw, bytes) else raw
+
+    def _set_member(self, sid: str, session_id: Optional[str]) -> None:
+        if session_id is None:
+            self.redis.delete(self._member_key(sid))
+        else:
+            self.redis.set(self._member_key(sid), session_id, ex=self.ttl)
+
+
+def create_session_registry(url: Optional[str]) -> SessionRegistry:
+    """Redis-backed registry for redis:// URLs, otherwise in-process"""
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisSessionRegistry(url)
+    return SessionRegistry()
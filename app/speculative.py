@@ -0,0 +1,239 @@
+import re
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.logging_config import get_logger, log_event, trace_id_var
+
+logger = get_logger(__name__)
+
+# End of the last complete sentence: a terminator followed by whitespace or the end
+_SENTENCE_END_RE = re.compile(r"[.!?][\"')\]]*(?=\s|$)")
+# The detector skips shorter texts, so neither prefixes nor tails below this are analyzed alone
+MIN_TEXT_LENGTH = 10
+
+
+def stable_prefix(text: str) -> str:
+    """Return `text` up to its last complete sentence, or "" if there is none
+
+    Speech recognizers keep revising the words after the last sentence
+    break, so only what comes before it is worth analyzing early.
+    """
+    end = None
+    for match in _SENTENCE_END_RE.finditer(text):
+        end = match.end()
+    if end is None:
+        return ""
+    prefix = text[:end].strip()
+    return prefix if len(prefix) >= MIN_TEXT_LENGTH else ""
+
+
+def shift_fallacy(fallacy: Any, offset: int) -> Any:
+    """Move a fallacy's character indices by `offset` (Fallacy models or dicts)"""
+    update = {
+        key: getattr(fallacy, key, None) if not isinstance(fallacy, dict) else fallacy.get(key)
+        for key in ("start_index", "end_index")
+    }
+    update = {key: value + offset for key, value in update.items() if isinstance(value, int)}
+    if not update:
+        return fallacy
+    if isinstance(fallacy, dict):
+        return {**fallacy, **update}
+    return fallacy.model_copy(update=update)
+
+
+class _ClientState:
+    """Speculation state for one client"""
+
+    def __init__(self):
+        self.cached_text = ""
+        self.cached_fallacies: List[Any] = []
+        self.cached_confidence = 0.0
+        self.wanted: Optional[str] = None
+        self.running: Optional[str] = None
+        self.cancel = threading.Event()
+        self.done = threading.Event()
+        self.worker_active = False
+        # Trace ID of the interim update that requested the current work
+        self.trace_id: Optional[str] = None
+
+
+class SpeculativeAnalyzer:
+    """Analyzes stable prefixes of interim transcripts ahead of the final text
+
+    Each client has at most one background worker, which analyzes the latest
+    stable prefix it was sent after a short delay, so bursts of interim
+    updates collapse into one request. Speculative work is low priority: it
+    only runs while fewer than `max_concurrent` speculative analyses are in
+    flight process-wide, and it is cancelled as soon as newer text diverges
+    from it. When the final text arrives and starts with a speculated
+    prefix, that result is reused and only the remaining tail is analyzed.
+    Clients that never send interim updates are unaffected: their final
+    text is always analyzed in full.
+    """
+
+    def __init__(self, detector, start_task: Optional[Callable] = None,
+                 sleep: Callable[[float], None] = time.sleep, delay: float = 0.3,
+                 max_concurrent: int = 2, commit_wait: float = 10.0):
+        self.detector = detector
+        self.start_task = start_task or self._start_thread
+        self.sleep = sleep
+        self.delay = delay
+        self.commit_wait = commit_wait
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._lock = threading.Lock()
+        self._clients: Dict[str, _ClientState] = {}
+        self._stats = {"speculated": 0, "cancelled": 0, "skipped_busy": 0, "hits": 0, "misses": 0}
+
+    @staticmethod
+    def _start_thread(target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def _count(self, key: str) -> None:
+        self._stats[key] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for speculative analyses and how often finals reused them"""
+        with self._lock:
+            return dict(self._stats)
+
+    def propose(self, sid: str, text: str) -> Optional[str]:
+        """Queue speculative analysis of an interim transcript's stable prefix
+
+        Returns the prefix that will be analyzed, or None if there is nothing
+        new. Running work that `text` no longer extends is cancelled.
+        """
+        prefix = stable_prefix(text)
+        with self._lock:
+            state = self._clients.setdefault(sid, _ClientState())
+            if state.running and not text.startswith(state.running):
+                state.cancel.set()
+                self._count("cancelled")
+            if not prefix or prefix in (state.cached_text, state.running, state.wanted):
+                return None
+            state.wanted = prefix
+            state.trace_id = trace_id_var.get()
+            if state.worker_active:
+                return prefix
+            state.worker_active = True
+        self.start_task(self._worker, sid, state)
+        return prefix
+
+    def discard(self, sid: str) -> None:
+        """Forget a client and cancel its speculative work"""
+        with self._lock:
+            state = self._clients.pop(sid, None)
+            if state is not None:
+                state.cancel.set()
+
+    def _worker(self, sid: str, state: _ClientState) -> None:
+        while True:
+            self.sleep(self.delay)
+            with self._lock:
+                target = state.wanted
+                if self._clients.get(sid) is not state or target is None or target == state.cached_text:
+                    state.worker_active = False
+                    return
+                if not self._slots.acquire(blocking=False):
+                    # Busy with other speculation; try again after the next delay
+                    self._count("skipped_busy")
+                    continue
+                state.wanted = None
+                state.running = target
+                # Background threads start with a fresh context; carry the requester's trace ID
+                trace_id_var.set(state.trace_id)
+                state.cancel = cancel = threading.Event()
+                state.done = done = threading.Event()
+                self._count("speculated")
+
+            result = None
+            try:
+                result = asyncio.run(self._detect_cancellable(target, cancel))
+            except Exception as e:
+                log_event(logger, "speculative_analysis_failed", level=logging.WARNING, error=str(e))
+            finally:
+                self._slots.release()
+
+            with self._lock:
+                if state.running == target:
+                    state.running = None
+                usable = result is not None and not result.get("error") and not cancel.is_set()
+                # A prefix of what is already cached adds nothing; anything else
+                # (a longer prefix, or new text after a reset) replaces it
+                if usable and not state.cached_text.startswith(target):
+                    self._store_locked(state, target, result)
+                done.set()
+
+    async def _detect_cancellable(self, text: str, cancel: threading.Event) -> Optional[Dict[str, Any]]:
+        task = asyncio.ensure_future(self.detector.detect_fallacies(text))
+        while not task.done():
+            if cancel.is_set():
+                task.cancel()
+                return None
+            await asyncio.wait({task}, timeout=0.05)
+        return task.result()
+
+    def _store_locked(self, state: _ClientState, text: str, result: Dict[str, Any]) -> None:
+        state.cached_text = text
+        state.cached_fallacies = list(result.get("fallacies") or [])
+        state.cached_confidence = result.get("confidence", 0.0) or 0.0
+
+    def _take(self, sid: str, text: str) -> Optional[Tuple[str, List[Any], float]]:
+        """Return the speculated (prefix, fallacies, confidence) that `text` starts with, if any"""
+        with self._lock:
+            state = self._clients.get(sid)
+            if state is None:
+                return None
+            # The final text supersedes any interim update still waiting
+            state.wanted = None
+            done = None
+            if state.running:
+                if text.startswith(state.running):
+                    done = state.done
+                else:
+                    state.cancel.set()
+                    self._count("cancelled")
+        if done is not None:
+            # Already in flight for this text; finishing it beats starting over
+            done.wait(self.commit_wait)
+        with self._lock:
+            tail = text[len(state.cached_text):].strip()
+            # A tail too short to analyze alone is analyzed together with its prefix
+            usable_tail = not tail or len(tail) >= MIN_TEXT_LENGTH
+            if state.cached_text and text.startswith(state.cached_text) and usable_tail:
+                self._count("hits")
+                return state.cached_text, list(state.cached_fallacies), state.cached_confidence
+            self._count("misses")
+            return None
+
+    def analyze_final(self, sid: str, text: str) -> Dict[str, Any]:
+        """Analyze final text, reusing speculative results for the prefix it starts with"""
+        hit = self._take(sid, text)
+        if hit is None:
+            result = asyncio.run(self.detector.detect_fallacies(text))
+        else:
+            prefix, cached_fallacies, cached_confidence = hit
+            tail = text[len(prefix):]
+            offset = len(prefix) + len(tail) - len(tail.lstrip())
+            fallacies = list(cached_fallacies)
+            confidence = cached_confidence
+            error = None
+            if tail.strip():
+                tail_result = asyncio.run(self.detector.detect_fallacies(tail.strip()))
+                error = tail_result.get("error")
+                fallacies.extend(shift_fallacy(f, offset) for f in tail_result.get("fallacies") or [])
+                confidence = max(confidence, tail_result.get("confidence", 0.0) or 0.0)
+            result = {
+                "has_fallacies": bool(fallacies),
+                "fallacies": fallacies,
+                "confidence": confidence
+            }
+            if error:
+                result["error"] = error
+            log_event(logger, "speculative_commit", level=logging.DEBUG,
+                      reused=len(prefix), tail=len(tail.strip()))
+        return result
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import signal
+import logging
+import subprocess
+from typing import Dict, List, Optional
+
+from app.logging_config import get_logger, log_event
+
+logger = get_logger(__name__)
+
+DEFAULT_MESSAGE_QUEUE = "redis://localhost:6379/0"
+
+
+def resolve_worker_count(value: Optional[str]) -> int:
+    """Parse WORKERS: a positive integer, or "auto" for one worker per available CPU"""
+    if not value:
+        return 1
+    if value.strip().lower() == "auto":
+        try:
+            # Respects CPU affinity (e.g. docker --cpuset-cpus), unlike os.cpu_count()
+            return max(1, len(os.sched_getaffinity(0)))
+        except AttributeError:
+            return max(1, os.cpu_count() or 1)
+    try:
+        return max(1, int(value))
+    except ValueError:
+        raise ValueError(f"WORKERS must be a positive integer or 'auto', got {value!r}")
+
+
+def worker_env(index: int, base_port: int, message_queue: str) -> Dict[str, str]:
+    """Environment for worker `index`: its own port, no reloader, shared message queue"""
+    env = dict(os.environ)
+    env.update({
+        "WORKERS": "1",
+        "WORKER_INDEX": str(index),
+        "PORT": str(base_port + index),
+        "FLASK_DEBUG": "false",
+        "SOCKETIO_MESSAGE_QUEUE": message_queue,
+    })
+    return env
+
+
+def resolve_message_queue(value: Optional[str]) -> str:
+    """Message queue URL for multiple workers; an in-process queue cannot be shared"""
+    if not value or value == "memory://":
+        return DEFAULT_MESSAGE_QUEUE
+    return value
+
+
+def run_workers(script: str, count: int, base_port: int) -> int:
+    """Run `count` copies of `script` on consecutive ports and restart any that die
+
+    Workers share emits, rooms and session state through
+    SOCKETIO_MESSAGE_QUEUE, which defaults to a local Redis. file:///path
+    also works for local development, but sessions then stay per worker.
+    """
+    message_queue = resolve_message_queue(os.getenv("SOCKETIO_MESSAGE_QUEUE"))
+    if message_queue.startswith("file://"):
+        log_event(logger, "file_message_queue", level=logging.WARNING,
+                  message="file:// message queue is for development only; use redis:// in production")
+
+    stopping = False
+
+    def spawn(index: int) -> subprocess.Popen:
+        log_event(logger, "worker_started", index=index, port=base_port + index)
+        return subprocess.Popen([sys.executable, script], env=worker_env(index, base_port, message_queue))
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    log_event(logger, "workers_starting", workers=count, base_port=base_port, message_queue=message_queue)
+    processes: List[subprocess.Popen] = [spawn(i) for i in range(count)]
+    while not stopping:
+        time.sleep(1.0)
+        for index, process in enumerate(processes):
+            if process.poll() is not None and not stopping:
+                log_event(logger, "worker_exited", level=logging.WARNING,
+                          index=index, returncode=process.returncode)
+                processes[index] = spawn(index)
+
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    deadline = time.monotonic() + 10
+    for process in processes:
+        try:
+            process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return 0
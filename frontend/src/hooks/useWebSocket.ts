@@ -133,12 +133,15 @@ export const useWebSocket = (
     };
   }, []); // Empty deps - only run once per component mount
 
-  const sendMessage = useCallback((text: string, speaker?: string) => {
+  // speculative=true marks an interim transcript: the server starts analyzing
+  // its completed sentences early but only replies to the final text
+  const sendMessage = useCallback((text: string, speaker?: string, speculative: boolean = false) => {
     if (globalSocket?.connected) {
       globalSocket.emit('message', {
         type: 'text',
         text: text,
         speaker: speaker || undefined,
+        speculative: speculative || undefined,
         timestamp: Date.now()
       });
     } else {
@@ -61,6 +61,7 @@ const AnalysisPage: React.FC = () => {
 
   const transcriptTimeoutRef = React.useRef<NodeJS.Timeout | null>(null);
   const lastSentTranscriptRef = React.useRef<string>('');
+  const lastSpeculativePrefixRef = React.useRef<string>('');
 
   React.useEffect(() => {
     if (!transcript || !isConnected) {
@@ -80,6 +81,17 @@ const AnalysisPage: React.FC = () => {
       return;
     }
 
+    // Send interim text as soon as a new sentence completes so the server can
+    // analyze it while the speaker keeps going
+    const sentenceEnd = Math.max(
+      trimmed.lastIndexOf('. '), trimmed.lastIndexOf('! '), trimmed.lastIndexOf('? ')
+    );
+    const stablePrefix = sentenceEnd >= 0 ? trimmed.slice(0, sentenceEnd + 1) : '';
+    if (stablePrefix.length >= 10 && stablePrefix !== lastSpeculativePrefixRef.current) {
+      lastSpeculativePrefixRef.current = stablePrefix;
+      sendMessage(trimmed, currentSpeaker, true);
+    }
+
     transcriptTimeoutRef.current = setTimeout(() => {
       const currentTrimmed = transcript.trim();
       if (currentTrimmed.length >= 10 && currentTrimmed !== lastSentTranscriptRef.current) {
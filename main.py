@@ -1,15 +1,28 @@
 from flask import Flask, request, jsonify, Blueprint
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit, disconnect
+from flask_socketio import SocketIO, emit, disconnect, join_room, leave_room
 from dotenv import load_dotenv
 import os
+import sys
 import asyncio
 import json
+import hmac
+import time
+import logging
+import threading
 
 from app.fallacy_detector import FallacyDetector
+from app.logging_config import configure_logging, get_logger, log_event, new_trace_id, trace_id_var
+from app.message_queue import queue_options
 from app.models import Fallacy
+from app.profiler import SamplingProfiler, rss_bytes
+from app.sessions import BROADCASTER, VIEWER, create_session_registry
+from app.speculative import SpeculativeAnalyzer
+from app.workers import resolve_worker_count, run_workers
 
 load_dotenv()
+configure_logging()
+logger = get_logger("main")
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'fallacy-detection-secret-key')
@@ -26,20 +39,50 @@ CORS(app, resources={
 
 # Initialize SocketIO for WebSocket support (with async_mode='threading' for compatibility)
 # Allow all origins for ngrok compatibility
+# With several worker processes, emits and rooms are shared through the
+# message queue in SOCKETIO_MESSAGE_QUEUE (redis://..., file:///path, ...)
+message_queue_options = queue_options(os.getenv("SOCKETIO_MESSAGE_QUEUE"))
+# Per-packet Socket.IO/Engine.IO logging is synchronous and very chatty, so it
+# is off unless SOCKETIO_DEBUG_LOGGING=true
+socketio_debug_logging = os.getenv("SOCKETIO_DEBUG_LOGGING", "false").lower() == "true"
 socketio = SocketIO(
     app, 
     cors_allowed_origins="*",  # Allow all origins for ngrok compatibility
     async_mode='threading',
-    logger=True,
-    engineio_logger=True,
+    logger=socketio_debug_logging,
+    engineio_logger=socketio_debug_logging,
     allow_upgrades=True,
     ping_timeout=60,
-    ping_interval=25
+    ping_interval=25,
+    **message_queue_options
 )
 
 # Initialize fallacy detector
 fallacy_detector = FallacyDetector()
 
+# On-demand sampling profiler for the admin endpoint
+profiler = SamplingProfiler()
+
+# Shared analysis sessions (one broadcaster, many viewers per room). With a
+# Redis message queue, session state lives in the same Redis so a broadcaster
+# and its viewers can be connected to different workers
+session_registry = create_session_registry(
+    os.getenv("SESSION_STORE_URL") or os.getenv("SOCKETIO_MESSAGE_QUEUE")
+)
+
+# Early analysis of interim transcripts ({"speculative": true} text messages),
+# reused when the final text arrives
+speculative_enabled = os.getenv("SPECULATIVE_ANALYSIS", "true").lower() == "true"
+speculative_analyzer = SpeculativeAnalyzer(
+    fallacy_detector,
+    start_task=socketio.start_background_task,
+    sleep=socketio.sleep,
+    max_concurrent=int(os.getenv("SPECULATIVE_MAX_CONCURRENT", "2"))
+)
+
+started_at = time.time()
+connected_sids = set()
+
 # Create API blueprint with /api prefix
 api = Blueprint('api', __name__)
 
@@ -54,9 +97,69 @@ def health():
     return jsonify({"status": "healthy"})
 
 
+@api.route("/ready")
+def ready():
+    """Readiness check - only passes once the model has answered within budget"""
+    readiness = fallacy_detector.readiness()
+    status = "ready" if readiness["ready"] else "not_ready"
+    return jsonify({"status": status, **readiness}), (200 if readiness["ready"] else 503)
+
+
+@api.route("/stats")
+def stats():
+    """Process statistics used by the load generator and dashboards"""
+    return jsonify({
+        "threads": threading.active_count(),
+        "rss_bytes": rss_bytes(),
+        "connected_clients": len(connected_sids),
+        "uptime": round(time.time() - started_at, 1),
+        "detector": fallacy_detector.parse_stats(),
+        "speculative": speculative_analyzer.stats()
+    })
+
+
+@api.route("/admin/profile", methods=["POST"])
+def admin_profile():
+    """Sample all threads for ?seconds=N and return folded stacks for a flame graph
+
+    Disabled unless ADMIN_TOKEN is set; requests must send
+    "Authorization: Bearer <ADMIN_TOKEN>".
+    """
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get("Authorization", "").encode(),
+                               f"Bearer {admin_token}".encode()):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        seconds = min(max(float(request.args.get("seconds", "10")), 0.1), 60.0)
+    except ValueError:
+        return jsonify({"error": "seconds must be a number"}), 400
+
+    try:
+        report = profiler.profile(seconds)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+
+    log_event(logger, "profile_complete", seconds=seconds, samples=report["samples"])
+    return profiler.to_folded(report["stacks"]), 200, {
+        "Content-Type": "text/plain; charset=utf-8",
+        "X-Profile-Samples": str(report["samples"])
+    }
+
+
 # Register API blueprint with /api prefix
 app.register_blueprint(api, url_prefix='/api')
 
+# nginx strips the /api prefix and the Docker healthcheck calls the backend
+# directly, so health, readiness, stats and the admin endpoints are also
+# served without the prefix
+app.add_url_rule("/health", "health", health)
+app.add_url_rule("/ready", "ready", ready)
+app.add_url_rule("/stats", "stats", stats)
+app.add_url_rule("/admin/profile", "admin_profile", admin_profile, methods=["POST"])
+
 # Root route (no prefix) - for info
 @app.route("/")
 def root_info():
@@ -64,34 +167,126 @@ def root_info():
         "message": "Real-time Fallacy Detection API",
         "api": "/api",
         "health": "/api/health",
+        "ready": "/api/ready",
         "websocket": "/socket.io/"
     })
 
 
+def build_detection_payload(text, result, trace_id):
+    """Build the fallacy_detection event from a detector result"""
+    # Safely convert Fallacy objects to dict for JSON serialization
+    fallacies_dict = []
+    if result and isinstance(result, dict):
+        fallacies = result.get("fallacies", [])
+        if fallacies:
+            for fallacy in fallacies:
+                try:
+                    if isinstance(fallacy, Fallacy):
+                        fallacies_dict.append({
+                            "type": fallacy.type or "unknown",
+                            "name": fallacy.name or "Unknown Fallacy",
+                            "severity": fallacy.severity or "low",
+                            "confidence": float(fallacy.confidence) if fallacy.confidence is not None else 0.0,
+                            "explanation": fallacy.explanation or "",
+                            "text_span": fallacy.text_span or "",
+                            "start_index": fallacy.start_index,
+                            "end_index": fallacy.end_index
+                        })
+                    elif isinstance(fallacy, dict):
+                        fallacies_dict.append(fallacy)
+                except Exception as e:
+                    log_event(logger, "fallacy_conversion_failed", level=logging.WARNING, error=str(e))
+                    continue
+    
+    # Safely get confidence
+    confidence = result.get("confidence", 0.0) if result else 0.0
+    try:
+        confidence = float(confidence) if confidence else 0.0
+    except (ValueError, TypeError):
+        confidence = 0.0
+    
+    payload = {
+        "type": "fallacy_detection",
+        "text": text,
+        "fallacies": fallacies_dict,
+        "has_fallacies": result.get("has_fallacies", False) if result else False,
+        "confidence": confidence,
+        "trace_id": trace_id
+    }
+    if result and result.get("error"):
+        payload["error"] = result["error"]
+    return payload
+
+
 @socketio.on('connect')
 def handle_connect():
-    print("Client connected")
+    connected_sids.add(request.sid)
+    log_event(logger, "client_connected", level=logging.DEBUG, sid=request.sid)
     emit('connected', {'status': 'connected'})
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    print("Client disconnected")
+    connected_sids.discard(request.sid)
+    session_registry.leave(request.sid)
+    speculative_analyzer.discard(request.sid)
+    log_event(logger, "client_disconnected", level=logging.DEBUG, sid=request.sid)
+
+
+@socketio.on('join_session')
+def handle_join_session(data):
+    """Join a shared analysis session as its broadcaster or as a read-only viewer"""
+    data = data if isinstance(data, dict) else {}
+    session_id = data.get("session_id")
+    role = data.get("role", VIEWER)
+    if not isinstance(session_id, str) or not session_id.strip() or len(session_id) > 128:
+        emit('error', {"error": "session_id must be a non-empty string of at most 128 characters"})
+        return
+    session_id = session_id.strip()
+    
+    previous = session_registry.membership(request.sid)
+    try:
+        session_registry.join(session_id, request.sid, role)
+    except ValueError as e:
+        emit('error', {"error": str(e)})
+        return
+    if previous and previous["session_id"] != session_id:
+        leave_room(previous["session_id"])
+    join_room(session_id)
+    
+    log_event(logger, "session_joined", session_id=session_id, role=role)
+    emit('session_joined', {"session_id": session_id, "role": role})
+    # Late joiners get the results so far instead of triggering re-analysis
+    emit('session_snapshot', session_registry.snapshot(session_id))
+
+
+@socketio.on('leave_session')
+def handle_leave_session(data=None):
+    """Leave the current shared analysis session"""
+    session_id = session_registry.leave(request.sid)
+    if session_id:
+        leave_room(session_id)
+        emit('session_left', {"session_id": session_id})
 
 
 @socketio.on('message')
 def handle_message(data):
     """Handle incoming messages from client"""
+    trace_token = trace_id_var.set(new_trace_id())
     try:
         # If data is a string, parse it
         if isinstance(data, str):
             try:
                 data = json.loads(data)
             except json.JSONDecodeError as e:
-                print(f"Error parsing JSON message: {e}")
+                log_event(logger, "invalid_message", level=logging.WARNING, error=str(e))
                 emit('error', {"error": "Invalid message format"})
                 return
         
+        # Clients may supply their own trace ID to correlate with their logs
+        if isinstance(data.get("trace_id"), str) and data["trace_id"]:
+            trace_id_var.set(data["trace_id"][:64])
+        trace_id = trace_id_var.get()
         message_type = data.get("type")
         
         if message_type == "text":
@@ -102,56 +297,53 @@ def handle_message(data):
                 # Too short, skip processing
                 return
             
-            # Prevent processing duplicate/very similar messages
-            # This helps during pauses when same text might be sent multiple times
+            log_event(logger, "text_received", level=logging.DEBUG, length=len(text))
+            
+            # In a shared session only the broadcaster's text is analyzed, once,
+            # and the result is broadcast to everyone in the room
+            membership = session_registry.membership(request.sid)
+            room = None
+            if membership:
+                if membership["role"] != BROADCASTER:
+                    emit('error', {"error": "Viewers cannot send text to a session"})
+                    return
+                room = membership["session_id"]
+            
+            # Interim transcripts only start background analysis of their
+            # stable prefix; nothing is emitted until the final text arrives
+            if data.get("speculative"):
+                if speculative_enabled:
+                    speculative_analyzer.propose(request.sid, text)
+                return
+            
+            if room and not session_registry.begin_analysis(room, text):
+                log_event(logger, "session_text_skipped", level=logging.DEBUG, session_id=room)
+                return
             
             try:
-                # Run async fallacy detection with timeout
-                result = asyncio.run(fallacy_detector.detect_fallacies(text))
-                
-                # Safely convert Fallacy objects to dict for JSON serialization
-                fallacies_dict = []
-                if result and isinstance(result, dict):
-                    fallacies = result.get("fallacies", [])
-                    if fallacies:
-                        for fallacy in fallacies:
-                            try:
-                                if isinstance(fallacy, Fallacy):
-                                    fallacies_dict.append({
-                                        "type": fallacy.type or "unknown",
-                                        "name": fallacy.name or "Unknown Fallacy",
-                                        "severity": fallacy.severity or "low",
-                                        "confidence": float(fallacy.confidence) if fallacy.confidence is not None else 0.0,
-                                        "explanation": fallacy.explanation or "",
-                                        "text_span": fallacy.text_span or "",
-                                        "start_index": fallacy.start_index,
-                                        "end_index": fallacy.end_index
-                                    })
-                                elif isinstance(fallacy, dict):
-                                    fallacies_dict.append(fallacy)
-                            except Exception as e:
-                                print(f"Error processing fallacy: {e}")
-                                continue
+                # Run async fallacy detection, reusing speculative results for
+                # the part of the text that was already analyzed
+                if speculative_enabled:
+                    result = speculative_analyzer.analyze_final(request.sid, text)
+                else:
+                    result = asyncio.run(fallacy_detector.detect_fallacies(text))
+                payload = build_detection_payload(text, result, trace_id)
+                if room:
+                    payload["session_id"] = room
+                    if payload.get("error"):
+                        session_registry.abandon_analysis(room, text)
+                    elif not session_registry.record_result(room, text, payload["fallacies"]):
+                        # A newer transcript finished first; don't send viewers an older result
+                        log_event(logger, "stale_session_result", level=logging.DEBUG, session_id=room)
+                        return
                 
-                # Safely get confidence
-                confidence = result.get("confidence", 0.0) if result else 0.0
-                try:
-                    confidence = float(confidence) if confidence else 0.0
-                except (ValueError, TypeError):
-                    confidence = 0.0
-                
-                # Send fallacy detection result back to client
-                emit('fallacy_detection', {
-                    "type": "fallacy_detection",
-                    "text": text,
-                    "fallacies": fallacies_dict,
-                    "has_fallacies": result.get("has_fallacies", False) if result else False,
-                    "confidence": confidence
-                })
+                # Send fallacy detection result back to the client, or to its session room
+                emit('fallacy_detection', payload, to=room)
+                log_event(logger, "detection_emitted", fallacies=len(payload["fallacies"]), session_id=room)
             except Exception as e:
-                print(f"Error detecting fallacies: {e}")
-                import traceback
-                traceback.print_exc()
+                log_event(logger, "detection_failed", level=logging.ERROR, exc_info=True, error=str(e))
+                if room:
+                    session_registry.abandon_analysis(room, text)
                 
                 # Send error response but don't crash
                 emit('error', {
@@ -160,32 +352,72 @@ def handle_message(data):
                 })
                 
                 # Still send a response with no fallacies so frontend knows processing completed
-                emit('fallacy_detection', {
+                payload = {
                     "type": "fallacy_detection",
                     "text": text,
                     "fallacies": [],
                     "has_fallacies": False,
                     "confidence": 0.0,
-                    "error": str(e)
-                })
+                    "error": str(e),
+                    "trace_id": trace_id
+                }
+                if room:
+                    payload["session_id"] = room
+                emit('fallacy_detection', payload, to=room)
                 
         elif message_type == "ping":
             # Keep-alive ping
+            log_event(logger, "ping", level=logging.DEBUG)
             emit('pong', {"type": "pong"})
         else:
-            print(f"Unknown message type: {message_type}")
+            log_event(logger, "unknown_message_type", level=logging.WARNING, message_type=message_type)
             
     except Exception as e:
-        print(f"Error handling message: {e}")
-        import traceback
-        traceback.print_exc()
+        log_event(logger, "message_handling_failed", level=logging.ERROR, exc_info=True, error=str(e))
         try:
             emit('error', {"error": str(e)})
         except:
             # If even emitting error fails, just log it
-            print("Critical error: Could not emit error to client")
+            log_event(logger, "error_emit_failed", level=logging.CRITICAL)
+    finally:
+        trace_id_var.reset(trace_token)
+
+
+def model_warmup_loop():
+    """Preload the model at startup and periodically keep it resident"""
+    interval = float(os.getenv("MODEL_WARMUP_INTERVAL", "60"))
+    # The first warm-up usually loads a cold model and runs over budget, so
+    # check again soon instead of staying not-ready for a full interval
+    retry_interval = min(float(os.getenv("MODEL_WARMUP_RETRY_INTERVAL", "5")), interval)
+    while True:
+        readiness = asyncio.run(fallacy_detector.warm_up())
+        if readiness["ready"]:
+            log_event(logger, "model_warm", model=readiness["model"], latency=readiness["latency"])
+        else:
+            log_event(logger, "model_not_ready", level=logging.WARNING,
+                      model=readiness["model"], error=readiness["error"])
+        socketio.sleep(interval if readiness["ready"] else retry_interval)
+
+
+def start_model_warmup():
+    """Start the background warm-up task unless disabled via MODEL_WARMUP=false"""
+    if os.getenv("MODEL_WARMUP", "true").lower() == "true":
+        socketio.start_background_task(model_warmup_loop)
 
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
-    socketio.run(app, host="0.0.0.0", port=port, debug=True)
+    
+    # WORKERS=N (or "auto" for one per CPU) runs N processes on ports PORT..PORT+N-1
+    workers = resolve_worker_count(os.getenv("WORKERS", "1"))
+    if workers > 1:
+        sys.exit(run_workers(os.path.abspath(__file__), workers, port))
+    
+    # The reloader and debugger are opt-in (FLASK_DEBUG=true for local development)
+    debug = os.getenv("FLASK_DEBUG", "false").lower() == "true"
+    # With debug on the reloader re-executes this module; only warm up in the
+    # child process that actually serves requests
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_model_warmup()
+    # The server is run without a TTY under Docker and the load generator
+    socketio.run(app, host="0.0.0.0", port=port, debug=debug, allow_unsafe_werkzeug=True)
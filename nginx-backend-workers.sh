@@ -0,0 +1,21 @@
+#!/bin/sh
+# Generates the upstream server list for the backend worker processes.
+# Runs from /docker-entrypoint.d before nginx starts. Worker i listens on
+# BACKEND_PORT + i, matching WORKERS in the backend container.
+set -e
+
+workers="${BACKEND_WORKERS:-1}"
+if [ "$workers" = "auto" ]; then
+    workers="$(nproc)"
+fi
+host="${BACKEND_HOST:-backend}"
+port="${BACKEND_PORT:-8000}"
+out=/etc/nginx/backend-workers.conf
+
+: > "$out"
+i=0
+while [ "$i" -lt "$workers" ]; do
+    echo "server ${host}:$((port + i));" >> "$out"
+    i=$((i + 1))
+done
+echo "backend-workers: $workers worker(s) starting at ${host}:${port}"
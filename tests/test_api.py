@@ -27,6 +27,72 @@ class TestAPIEndpoints:
         assert response.status_code == 200
         assert response.get_json() == {"status": "healthy"}
     
+    def test_ready_endpoint_not_ready(self, client):
+        """Test readiness endpoint fails until the model is warm"""
+        from main import fallacy_detector
+        
+        with patch.object(fallacy_detector, "ready", False):
+            response = client.get("/api/ready")
+            assert response.status_code == 503
+            assert response.get_json()["status"] == "not_ready"
+    
+    def test_ready_endpoint_ready(self, client):
+        """Test readiness endpoint passes once the model is warm"""
+        from main import fallacy_detector
+        
+        with patch.object(fallacy_detector, "ready", True):
+            response = client.get("/ready")
+            assert response.status_code == 200
+            assert response.get_json()["status"] == "ready"
+    
+    def test_stats_endpoint(self, client):
+        """Test process statistics endpoint"""
+        response = client.get("/api/stats")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["threads"] >= 1
+        assert "rss_bytes" in data
+        assert data["connected_clients"] >= 0
+    
+    def test_stats_endpoint_without_prefix(self, client):
+        """Test statistics are served at the documented /stats path"""
+        response = client.get("/stats")
+        assert response.status_code == 200
+        assert "detector" in response.get_json()
+    
+    def test_admin_profile_disabled_without_token(self, client, monkeypatch):
+        """Test profiling endpoint is hidden unless ADMIN_TOKEN is set"""
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        response = client.post("/api/admin/profile?seconds=0.1")
+        assert response.status_code == 404
+    
+    def test_admin_profile_requires_token(self, client, monkeypatch):
+        """Test profiling endpoint rejects a wrong token"""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = client.post("/api/admin/profile?seconds=0.1",
+                               headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+    
+    def test_admin_profile_returns_folded_stacks(self, client, monkeypatch):
+        """Test profiling endpoint returns a flame-graph-ready report"""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = client.post("/api/admin/profile?seconds=0.1",
+                               headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        assert int(response.headers["X-Profile-Samples"]) > 0
+        for line in response.get_data(as_text=True).splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+    
+    def test_admin_profile_without_prefix(self, client, monkeypatch):
+        """Test profiling endpoint is reachable at the path nginx forwards to"""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = client.post("/admin/profile?seconds=0.1",
+                               headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+    
     def test_websocket_connection(self, client):
         """Test Socket.IO connection"""
         # Note: Socket.IO testing requires socketio.test_client()
@@ -65,3 +131,92 @@ class TestAPIEndpoints:
             fallacy_detector.detect_fallacies = original_detect
 
 
+    
+    def test_websocket_trace_id_round_trip(self):
+        """Test a client-supplied trace ID is echoed on the detection result"""
+        from main import fallacy_detector
+        from unittest.mock import AsyncMock
+        
+        original_detect = fallacy_detector.detect_fallacies
+        
+        try:
+            fallacy_detector.detect_fallacies = AsyncMock(return_value={
+                "has_fallacies": False,
+                "fallacies": [],
+                "confidence": 0.0
+            })
+            
+            socketio_client = socketio.test_client(app)
+            socketio_client.emit('message', {
+                "type": "text",
+                "text": "Hello world",
+                "trace_id": "trace-123"
+            })
+            
+            detections = [r for r in socketio_client.get_received() if r["name"] == "fallacy_detection"]
+            assert len(detections) == 1
+            assert detections[0]["args"][0]["trace_id"] == "trace-123"
+            socketio_client.disconnect()
+        finally:
+            fallacy_detector.detect_fallacies = original_detect
+    
+    def test_session_broadcast_and_snapshot(self):
+        """Test a broadcaster's text is analyzed once and fanned out to viewers"""
+        from main import fallacy_detector
+        from unittest.mock import AsyncMock
+        
+        original_detect = fallacy_detector.detect_fallacies
+        
+        try:
+            fallacy_detector.detect_fallacies = AsyncMock(return_value={
+                "has_fallacies": False,
+                "fallacies": [],
+                "confidence": 0.5
+            })
+            
+            broadcaster = socketio.test_client(app)
+            viewer = socketio.test_client(app)
+            broadcaster.emit('join_session', {"session_id": "debate", "role": "broadcaster"})
+            viewer.emit('join_session', {"session_id": "debate", "role": "viewer"})
+            viewer.get_received()
+            
+            broadcaster.emit('message', {"type": "text", "text": "Hello world, this is a test"})
+            broadcaster.emit('message', {"type": "text", "text": "Hello world, this is a test"})
+            assert fallacy_detector.detect_fallacies.call_count == 1
+            
+            received = [r for r in viewer.get_received() if r["name"] == "fallacy_detection"]
+            assert len(received) == 1
+            assert received[0]["args"][0]["session_id"] == "debate"
+            
+            # Viewers are read-only
+            viewer.emit('message', {"type": "text", "text": "Viewer text should be ignored"})
+            assert fallacy_detector.detect_fallacies.call_count == 1
+            assert any(r["name"] == "error" for r in viewer.get_received())
+            
+            # Late joiners get a snapshot instead of re-analysis
+            late_viewer = socketio.test_client(app)
+            late_viewer.emit('join_session', {"session_id": "debate", "role": "viewer"})
+            snapshots = [r for r in late_viewer.get_received() if r["name"] == "session_snapshot"]
+            assert snapshots[0]["args"][0]["text"] == "Hello world, this is a test"
+            assert snapshots[0]["args"][0]["analyses"] == 1
+            assert fallacy_detector.detect_fallacies.call_count == 1
+            
+            for client in (broadcaster, viewer, late_viewer):
+                client.disconnect()
+        finally:
+            fallacy_detector.detect_fallacies = original_detect
+    
+    def test_speculative_text_not_emitted(self):
+        """Test interim text marked speculative is analyzed in the background without a result event"""
+        from main import speculative_analyzer
+        from unittest.mock import patch
+        
+        client = socketio.test_client(app)
+        client.get_received()
+        with patch.object(speculative_analyzer, "propose") as propose:
+            client.emit('message', {"type": "text", "speculative": True,
+                                    "text": "You are wrong. And another thing"})
+        propose.assert_called_once()
+        assert propose.call_args[0][1] == "You are wrong. And another thing"
+        assert not [r for r in client.get_received() if r["name"] == "fallacy_detection"]
+        client.disconnect()
@@ -0,0 +1,104 @@
+
+import io
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.batch import Progress, iter_items, load_checkpoint, run_batch
+from app.models import Fallacy
+
+
+def make_detector(api_base, result):
+    detector = MagicMock()
+    detector.api_base = api_base
+    detector.detect_fallacies = AsyncMock(return_value=result)
+    return detector
+
+
+class TestIterItems:
+    """Tests for input parsing"""
+    
+    def test_jsonl_items(self):
+        """Test JSONL records keep their IDs and default to line numbers"""
+        stream = io.StringIO('{"id": "a", "text": "First"}\n\n{"text": "Second"}\nnot json\n{"id": 4}\n')
+        assert list(iter_items(stream, jsonl=True)) == [
+            {"id": "a", "text": "First"},
+            {"id": "3", "text": "Second"}
+        ]
+    
+    def test_text_items(self):
+        """Test plain text uses one transcript per line"""
+        stream = io.StringIO("First line\n\nSecond line\n")
+        assert list(iter_items(stream, jsonl=False)) == [
+            {"id": "1", "text": "First line"},
+            {"id": "3", "text": "Second line"}
+        ]
+
+
+class TestCheckpoint:
+    """Tests for resume support"""
+    
+    def test_missing_output(self, tmp_path):
+        """Test a fresh run has nothing to skip"""
+        assert load_checkpoint(str(tmp_path / "out.jsonl")) == set()
+    
+    def test_torn_final_line_is_dropped(self, tmp_path):
+        """Test a partially written last record is removed and not counted"""
+        output = tmp_path / "out.jsonl"
+        output.write_text('{"id": "a"}\n{"id": "b"}\n{"id": "c", "fall')
+        assert load_checkpoint(str(output)) == {"a", "b"}
+        assert output.read_text() == '{"id": "a"}\n{"id": "b"}\n'
+    
+    def test_missing_trailing_newline_is_added(self, tmp_path):
+        """Test a complete last record without a newline stays separate from new appends"""
+        output = tmp_path / "out.jsonl"
+        output.write_text('{"id": "a"}')
+        assert load_checkpoint(str(output)) == {"a"}
+        assert output.read_text() == '{"id": "a"}\n'
+    
+    def test_blank_and_corrupt_middle_lines_are_skipped(self, tmp_path):
+        """Test records after a blank or corrupt line are kept and the file is not truncated"""
+        output = tmp_path / "out.jsonl"
+        content = '{"id": "a"}\n\n{"id": "b", "fall\n{"id": "c"}\n'
+        output.write_text(content)
+        assert load_checkpoint(str(output)) == {"a", "c"}
+        assert output.read_text() == content
+
+
+class TestRunBatch:
+    """Tests for run_batch"""
+    
+    @pytest.mark.asyncio
+    async def test_results_skip_and_errors(self):
+        """Test finished IDs are skipped, results written and failures reported separately"""
+        fallacy = Fallacy(type="ad_hominem", name="Ad Hominem", severity="high",
+                          confidence=0.9, explanation="Attack", text_span="idiot")
+        good = make_detector("http://a", {"has_fallacies": True, "fallacies": [fallacy], "confidence": 0.9})
+        bad = make_detector("http://b", {"has_fallacies": False, "fallacies": [], "confidence": 0.0,
+                                         "error": "boom"})
+        items = [{"id": str(i), "text": f"Transcript {i}"} for i in range(4)]
+        output, errors = io.StringIO(), io.StringIO()
+        progress = Progress(total=4, skipped=1)
+        
+        await run_batch(iter(items), [good, bad], output, errors, concurrency=2,
+                        skip={"0"}, progress=progress)
+        
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        failures = [json.loads(line) for line in errors.getvalue().splitlines()]
+        assert {r["id"] for r in results} | {f["id"] for f in failures} == {"1", "2", "3"}
+        assert all(r["fallacies"][0]["type"] == "ad_hominem" for r in results)
+        assert all(f["error"] == "boom" for f in failures)
+        assert progress.done == len(results)
+        assert progress.failed == len(failures)
+        assert good.detect_fallacies.call_count + bad.detect_fallacies.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_every_backend_used_with_low_concurrency(self):
+        """Test items are spread over all backends even with a single worker"""
+        result = {"has_fallacies": False, "fallacies": [], "confidence": 0.5}
+        detectors = [make_detector(f"http://{name}", result) for name in "abc"]
+        items = [{"id": str(i), "text": f"Transcript {i}"} for i in range(6)]
+        
+        await run_batch(iter(items), detectors, io.StringIO(), io.StringIO(), concurrency=1,
+                        skip=set(), progress=Progress(total=6, skipped=0))
+        
+        assert [d.detect_fallacies.call_count for d in detectors] == [2, 2, 2]
@@ -1,5 +1,6 @@
 import pytest
 import os
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 from app.fallacy_detector import FallacyDetector
 from app.models import Fallacy
@@ -195,3 +196,208 @@ class TestFallacyDetector:
             assert "error" in result or result["has_fallacies"] is False
 
 
+
+    @pytest.mark.asyncio
+    async def test_warm_up_success(self):
+        """Test warm-up marks the detector ready and keeps the model resident"""
+        detector = FallacyDetector()
+        detector.use_ollama = True
+        assert detector.readiness()["ready"] is False
+        
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_response_obj = MagicMock()
+            mock_response_obj.raise_for_status = MagicMock()
+            mock_client.post = AsyncMock(return_value=mock_response_obj)
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=False)
+            mock_client_class.return_value = mock_client
+            
+            readiness = await detector.warm_up()
+            
+            assert readiness["ready"] is True
+            assert readiness["error"] is None
+            assert readiness["latency"] is not None
+            url = mock_client.post.call_args.args[0]
+            payload = mock_client.post.call_args.kwargs["json"]
+            assert url.endswith("/api/generate")
+            assert payload["keep_alive"] == detector.keep_alive
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_failure(self):
+        """Test warm-up leaves the detector not ready when the backend is down"""
+        detector = FallacyDetector()
+        detector.ready = True
+        
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_client.post = AsyncMock(side_effect=Exception("Connection refused"))
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=False)
+            mock_client_class.return_value = mock_client
+            
+            readiness = await detector.warm_up()
+            
+            assert readiness["ready"] is False
+            assert "Connection refused" in readiness["error"]
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_over_latency_budget(self):
+        """Test warm-up that answers too slowly does not count as ready"""
+        detector = FallacyDetector()
+        detector.ready_latency_budget = -1.0
+        
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_response_obj = MagicMock()
+            mock_response_obj.raise_for_status = MagicMock()
+            mock_client.post = AsyncMock(return_value=mock_response_obj)
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=False)
+            mock_client_class.return_value = mock_client
+            
+            readiness = await detector.warm_up()
+            
+            assert readiness["ready"] is False
+            assert "budget" in readiness["error"]
+    
+    def _mock_client(self, mock_client_class, contents):
+        """Configure the patched AsyncClient to return Ollama replies in order"""
+        responses = []
+        for content in contents:
+            response_obj = MagicMock()
+            response_obj.json.return_value = {"message": {"content": content}}
+            response_obj.raise_for_status = MagicMock()
+            responses.append(response_obj)
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(side_effect=responses)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=False)
+        mock_client_class.return_value = mock_client
+        return mock_client
+    
+    @pytest.mark.asyncio
+    async def test_detect_fallacies_requests_json_schema(self):
+        """Test Ollama is asked for output matching the result schema"""
+        detector = FallacyDetector()
+        detector.use_ollama = True
+        
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = self._mock_client(mock_client_class, [
+                '{"has_fallacies": false, "fallacies": [], "confidence": 0.0}'
+            ])
+            await detector.detect_fallacies("Some text that is long enough")
+            
+            payload = mock_client.post.call_args.kwargs["json"]
+            assert payload["format"]["title"] == "FallacyDetectionResult"
+            assert "fallacies" in payload["format"]["properties"]
+    
+    @pytest.mark.asyncio
+    async def test_detect_fallacies_openai_json_schema(self):
+        """Test OpenAI-compatible servers get a json_schema response_format"""
+        detector = FallacyDetector()
+        detector.use_ollama = False
+        
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_response_obj = MagicMock()
+            mock_response_obj.json.return_value = {"choices": [{"message": {
+                "content": '{"has_fallacies": false, "fallacies": [], "confidence": 0.0}'
+            }}]}
+            mock_response_obj.raise_for_status = MagicMock()
+            mock_client.post = AsyncMock(return_value=mock_response_obj)
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=False)
+            mock_client_class.return_value = mock_client
+            
+            await detector.detect_fallacies("Some text that is long enough")
+            
+            response_format = mock_client.post.call_args.kwargs["json"]["response_format"]
+            assert response_format["type"] == "json_schema"
+            assert response_format["json_schema"]["schema"] == detector.response_schema
+    
+    @pytest.mark.asyncio
+    async def test_detect_fallacies_repairs_truncated_json(self):
+        """Test truncated output is repaired without another model call"""
+        detector = FallacyDetector()
+        detector.use_ollama = True
+        
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = self._mock_client(mock_client_class, [
+                '{"has_fallacies": true, "fallacies": [{"type": "ad_hominem", "name": "Ad Hominem", '
+                '"severity": "high", "confidence": 0.9, "explanation": "Attack", "text_span": "idiot"}], '
+                '"confidence": 0.9, "analysis": "The speaker insul'
+            ])
+            result = await detector.detect_fallacies("You're an idiot if you think that")
+            
+            assert mock_client.post.call_count == 1
+            assert result["has_fallacies"] is True
+            assert result["fallacies"][0].type == "ad_hominem"
+            stats = detector.parse_stats()
+            assert stats["parse_failures"] == 1
+            assert stats["repaired"] == 1
+            assert stats["retries"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_detect_fallacies_retries_unrepairable_output(self):
+        """Test the model is asked again only when repair fails"""
+        detector = FallacyDetector()
+        detector.use_ollama = True
+        detector.json_max_retries = 1
+        
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = self._mock_client(mock_client_class, [
+                "I cannot answer that",
+                '{"has_fallacies": false, "fallacies": [], "confidence": 0.2}'
+            ])
+            result = await detector.detect_fallacies("Some text that is long enough")
+            
+            assert mock_client.post.call_count == 2
+            assert "error" not in result
+            assert result["confidence"] == 0.2
+            assert detector.parse_stats()["retries"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_detect_fallacies_retry_limit(self):
+        """Test retries are bounded and the failure is reported"""
+        detector = FallacyDetector()
+        detector.use_ollama = True
+        detector.json_max_retries = 1
+        
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = self._mock_client(mock_client_class, ["not json", "still not json"])
+            result = await detector.detect_fallacies("Some text that is long enough")
+            
+            assert mock_client.post.call_count == 2
+            assert "error" in result
+            assert detector.parse_stats()["unrecoverable"] == 1
+    
+    def test_parse_response_drops_incomplete_repaired_entries(self):
+        """Test a truncated last fallacy is dropped instead of returned with default fields"""
+        detector = FallacyDetector()
+        parsed = detector._parse_response(
+            '{"has_fallacies": true, "fallacies": [{"type": "ad_hominem", "name": "Ad Hominem", '
+            '"severity": "high", "confidence": 0.9, "explanation": "Attack", "text_span": "idiot"}, '
+            '{"type": "strawman", "sever'
+        )
+        assert [f["type"] for f in parsed["fallacies"]] == ["ad_hominem"]
+    
+    def test_parse_response_plain_json_with_backticks(self):
+        """Test well-formed JSON is parsed as-is even when a string contains a fence"""
+        detector = FallacyDetector()
+        text = '{"has_fallacies": false, "analysis": "Quoted ```json``` block, ] and }"}'
+        assert detector._parse_response(text) == {
+            "has_fallacies": False,
+            "analysis": "Quoted ```json``` block, ] and }"
+        }
+        assert detector.parse_stats()["parse_failures"] == 0
+    
+    def test_recent_detection_counts_as_ready(self):
+        """Test a recent successful detection keeps the detector ready despite a slow warm-up"""
+        detector = FallacyDetector()
+        detector.ready = False
+        assert detector.readiness()["ready"] is False
+        detector.last_success_at = time.time()
+        assert detector.readiness()["ready"] is True
+        detector.last_success_at = time.time() - detector.ready_success_window - 1
+        assert detector.readiness()["ready"] is False
@@ -0,0 +1,76 @@
+
+import pytest
+from app.json_repair import repair_json, strip_code_fences
+
+
+class TestStripCodeFences:
+    """Tests for strip_code_fences"""
+    
+    def test_fenced_json(self):
+        """Test the contents of a json code block are returned"""
+        assert strip_code_fences('```json\n{"a": 1}\n```') == '{"a": 1}'
+    
+    def test_fence_with_prose(self):
+        """Test a code block inside prose is left for repair_json to extract"""
+        text = 'Here you go:\n```\n{"a": 1}\n```\nThanks'
+        assert strip_code_fences(text) == text.strip()
+        assert repair_json(text) == {"a": 1}
+    
+    def test_backticks_inside_string(self):
+        """Test backticks inside a JSON string are not treated as a fence"""
+        text = '```json\n{"analysis": "use ```code``` here"}\n```'
+        assert strip_code_fences(text) == '{"analysis": "use ```code``` here"}'
+        assert strip_code_fences('{"analysis": "use ```code``` here"}') == '{"analysis": "use ```code``` here"}'
+    
+    def test_no_fence(self):
+        """Test unfenced text is returned unchanged"""
+        assert strip_code_fences('  {"a": 1} ') == '{"a": 1}'
+
+
+class TestRepairJson:
+    """Tests for repair_json"""
+    
+    def test_leading_and_trailing_prose(self):
+        """Test JSON embedded in prose is extracted"""
+        assert repair_json('Sure! {"has_fallacies": false} Hope this helps.') == {"has_fallacies": False}
+    
+    def test_unterminated_fence(self):
+        """Test a code block cut off before its closing fence"""
+        assert repair_json('```json\n{"a": [1, 2]}') == {"a": [1, 2]}
+    
+    def test_trailing_comma(self):
+        """Test trailing commas are removed"""
+        assert repair_json('{"a": [1, 2,], "b": 3,}') == {"a": [1, 2], "b": 3}
+    
+    def test_comma_before_bracket_inside_string(self):
+        """Test commas followed by a bracket inside strings are preserved"""
+        assert repair_json('{"a": "x, ]", "b": "y,}",}') == {"a": "x, ]", "b": "y,}"}
+        assert repair_json('{"a": "x, ]", "b": [1') == {"a": "x, ]", "b": [1]}
+    
+    def test_truncated_inside_string(self):
+        """Test output cut off in the middle of a string value"""
+        result = repair_json('{"has_fallacies": true, "analysis": "The speaker att')
+        assert result == {"has_fallacies": True, "analysis": "The speaker att"}
+    
+    def test_truncated_inside_nested_object(self):
+        """Test the unfinished tail of a nested object is dropped"""
+        result = repair_json(
+            '{"has_fallacies": true, "fallacies": [{"type": "ad_hominem", "name": "Ad Hominem"}, '
+            '{"type": "strawman", "sever'
+        )
+        assert result["has_fallacies"] is True
+        assert result["fallacies"][0] == {"type": "ad_hominem", "name": "Ad Hominem"}
+        assert result["fallacies"][1] == {"type": "strawman"}
+    
+    def test_truncated_after_key(self):
+        """Test output cut off right after a key"""
+        assert repair_json('{"a": 1, "b": ') == {"a": 1}
+    
+    def test_escaped_quotes(self):
+        """Test escaped quotes inside strings do not confuse the scanner"""
+        assert repair_json('{"a": "say \\"hi\\", ok", "b": [1') == {"a": 'say "hi", ok', "b": [1]}
+    
+    def test_not_json(self):
+        """Test text without any JSON object raises ValueError"""
+        with pytest.raises(ValueError):
+            repair_json("This is not valid JSON")
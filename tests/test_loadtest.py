@@ -0,0 +1,91 @@
+
+import json
+import random
+import threading
+import httpx
+import pytest
+from tools.fake_model_server import start_in_thread
+from tools.loadtest import (
+    DEBOUNCE_SECONDS, SpeakerClient, build_send_schedule, load_corpus, percentile
+)
+
+
+class TestSendSchedule:
+    """Tests for the speech cadence replay"""
+    
+    def test_continuous_speech_sends_once_at_end(self):
+        """Test a transcript without long pauses is sent once, 3s after the last word"""
+        schedule = build_send_schedule("one two three four five six", wpm=60,
+                                       pause_range=(0.0, 0.0), rng=random.Random(0))
+        assert schedule == [(5.0 + DEBOUNCE_SECONDS, "one two three four five six")]
+    
+    def test_long_pause_sends_growing_transcript(self):
+        """Test pauses longer than the debounce send the transcript so far"""
+        schedule = build_send_schedule("This is sentence one. This is sentence two.", wpm=120,
+                                       pause_range=(5.0, 5.0), rng=random.Random(0))
+        assert [text for _, text in schedule] == [
+            "This is sentence one.",
+            "This is sentence one. This is sentence two."
+        ]
+        assert schedule[0][0] < schedule[1][0]
+    
+    def test_short_text_not_sent(self):
+        """Test transcripts shorter than the frontend minimum are never sent"""
+        assert build_send_schedule("Hi there", wpm=150, rng=random.Random(0)) == []
+
+
+class TestHelpers:
+    """Tests for load test helpers"""
+    
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([], 50) is None
+    
+    def test_load_corpus(self, tmp_path):
+        """Test text and JSONL corpora are both supported"""
+        text_file = tmp_path / "corpus.txt"
+        text_file.write_text("First transcript\nspans lines.\n\nSecond transcript.\n")
+        jsonl_file = tmp_path / "corpus.jsonl"
+        jsonl_file.write_text(json.dumps({"text": "Third transcript."}) + "\n\n")
+        
+        assert load_corpus([str(text_file), str(jsonl_file)]) == [
+            "First transcript spans lines.",
+            "Second transcript.",
+            "Third transcript."
+        ]
+    
+    def test_failed_analysis_counted_once(self):
+        """Test a failed analysis counts as one error and still records its latency"""
+        speaker = SpeakerClient("http://localhost:0", ["unused"], wpm=150, stop_event=threading.Event())
+        speaker.pending["t1"] = 0.0
+        assert "error" not in speaker.sio.handlers.get("/", {})
+        speaker._on_detection({"type": "fallacy_detection", "error": "boom", "trace_id": "t1"})
+        assert speaker.errors == 1
+        assert len(speaker.latencies) == 1
+
+
+class TestFakeModelServer:
+    """Tests for the fake model server"""
+    
+    @pytest.fixture
+    def server(self):
+        server = start_in_thread(port=0, latency=0.0, jitter=0.0, fallacy_rate=1.0)
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+    
+    def test_ollama_chat(self, server):
+        """Test Ollama chat responses carry detection JSON"""
+        response = httpx.post(f"{server}/api/chat", json={"model": "fake"})
+        content = json.loads(response.json()["message"]["content"])
+        assert content["has_fallacies"] is True
+    
+    def test_openai_chat(self, server):
+        """Test OpenAI-compatible responses carry detection JSON"""
+        response = httpx.post(f"{server}/v1/chat/completions", json={"model": "fake"})
+        content = json.loads(response.json()["choices"][0]["message"]["content"])
+        assert content["fallacies"][0]["type"] == "ad_hominem"
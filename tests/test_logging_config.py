@@ -0,0 +1,78 @@
+import json
+import logging
+from app.logging_config import (
+    JsonFormatter, NonBlockingQueueHandler, SamplingFilter, configure_logging, parse_sample_rates,
+    trace_id_var
+)
+
+
+def make_record(event, level=logging.INFO, **fields):
+    record = logging.LogRecord("app.test", level, __file__, 1, event, None, None)
+    record.event = event
+    record.fields = fields
+    return record
+
+
+class TestSampleRates:
+    """Tests for LOG_SAMPLE_RATES parsing"""
+    
+    def test_parse_sample_rates(self):
+        """Test valid entries are parsed and clamped"""
+        rates = parse_sample_rates("ping=0.01, text_received=0.5,bad,other=2")
+        assert rates == {"ping": 0.01, "text_received": 0.5, "other": 1.0}
+    
+    def test_parse_sample_rates_invalid(self):
+        """Test malformed rates are ignored"""
+        assert parse_sample_rates("ping=abc") == {}
+        assert parse_sample_rates("") == {}
+
+
+class TestSamplingFilter:
+    """Tests for SamplingFilter"""
+    
+    def test_drops_sampled_out_events(self):
+        """Test events with a zero rate are dropped"""
+        sampling_filter = SamplingFilter({"ping": 0.0})
+        assert sampling_filter.filter(make_record("ping")) is False
+        assert sampling_filter.filter(make_record("detection_complete")) is True
+    
+    def test_keeps_warnings(self):
+        """Test warnings are never sampled out"""
+        sampling_filter = SamplingFilter({"ping": 0.0})
+        assert sampling_filter.filter(make_record("ping", level=logging.WARNING)) is True
+    
+    def test_attaches_trace_id(self):
+        """Test the current trace ID is attached to the record"""
+        token = trace_id_var.set("abc123")
+        try:
+            record = make_record("detection_complete")
+            SamplingFilter({}).filter(record)
+            assert record.trace_id == "abc123"
+        finally:
+            trace_id_var.reset(token)
+
+
+class TestJsonFormatter:
+    """Tests for JsonFormatter"""
+    
+    def test_format_includes_fields(self):
+        """Test structured fields end up in the JSON line"""
+        record = make_record("detection_complete", fallacies=2)
+        record.trace_id = "abc123"
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["event"] == "detection_complete"
+        assert entry["level"] == "INFO"
+        assert entry["trace_id"] == "abc123"
+        assert entry["fallacies"] == 2
+
+
+class TestConfigureLogging:
+    """Tests for configure_logging"""
+    
+    def test_werkzeug_logs_are_queued(self):
+        """Test Werkzeug's request log goes through the queue handler at WARNING"""
+        configure_logging()
+        werkzeug_logger = logging.getLogger("werkzeug")
+        assert werkzeug_logger.propagate is False
+        assert werkzeug_logger.level == logging.WARNING
+        assert any(isinstance(h, NonBlockingQueueHandler) for h in werkzeug_logger.handlers)
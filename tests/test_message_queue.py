@@ -0,0 +1,104 @@
+
+import os
+import threading
+import socketio
+from flask import Flask
+from flask_socketio import SocketIO, join_room
+from werkzeug.serving import make_server
+from app.message_queue import FileQueueManager, queue_options
+
+
+class TestQueueOptions:
+    """Tests for SOCKETIO_MESSAGE_QUEUE handling"""
+    
+    def test_in_process_default(self):
+        """Test no URL or memory:// keeps the in-process manager"""
+        assert queue_options(None) == {}
+        assert queue_options("memory://") == {}
+    
+    def test_file_queue(self, tmp_path):
+        """Test file:// URLs use the file-backed manager"""
+        path = tmp_path / "queue"
+        options = queue_options(f"file://{path}")
+        assert isinstance(options["client_manager"], FileQueueManager)
+        assert options["client_manager"].path == str(path)
+        assert path.exists()
+    
+    def test_external_queue(self):
+        """Test other URLs are passed to Flask-SocketIO"""
+        assert queue_options("redis://localhost:6379/0") == {"message_queue": "redis://localhost:6379/0"}
+
+
+class TestFileQueueManager:
+    """Tests for FileQueueManager"""
+    
+    def test_publish_and_listen(self, tmp_path):
+        """Test messages published by one manager reach another on the same file"""
+        path = str(tmp_path / "queue")
+        listener = FileQueueManager(path)
+        publisher = FileQueueManager(path)
+        other_channel = FileQueueManager(path, channel="other")
+        
+        publisher._publish({"method": "emit", "event": "first"})
+        other_channel._publish({"method": "emit", "event": "ignored"})
+        publisher._publish({"method": "emit", "event": "second"})
+        
+        received = []
+        
+        def listen():
+            for message in listener._listen():
+                received.append(message["event"])
+                if len(received) == 2:
+                    return
+        
+        thread = threading.Thread(target=listen, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        assert received == ["first", "second"]
+    
+    def test_ignores_messages_before_start(self, tmp_path):
+        """Test a new manager does not replay messages already in the file"""
+        path = str(tmp_path / "queue")
+        FileQueueManager(path)._publish({"method": "emit", "event": "old"})
+        manager = FileQueueManager(path)
+        assert manager._start_offset == os.path.getsize(path)
+    
+    def test_emit_across_servers(self, tmp_path):
+        """Test a room emit on one server reaches clients connected to another"""
+        path = str(tmp_path / "queue")
+        servers = []
+        
+        def start_server():
+            app = Flask(__name__)
+            server = SocketIO(app, async_mode="threading",
+                              client_manager=FileQueueManager(path, poll_interval=0.005))
+            
+            @server.on("join")
+            def on_join(room):
+                join_room(room)
+                return "joined"
+            
+            http_server = make_server("127.0.0.1", 0, app, threaded=True)
+            threading.Thread(target=http_server.serve_forever, daemon=True).start()
+            servers.append(http_server)
+            return server, f"http://127.0.0.1:{http_server.server_port}"
+        
+        server_a, url_a = start_server()
+        server_b, url_b = start_server()
+        received = threading.Event()
+        client = socketio.Client()
+        
+        @client.on("update")
+        def on_update(data):
+            if data == {"value": 1}:
+                received.set()
+        
+        try:
+            client.connect(url_a, transports=["polling"], wait_timeout=5)
+            assert client.call("join", "room", timeout=5) == "joined"
+            server_b.emit("update", {"value": 1}, to="room")
+            assert received.wait(timeout=5)
+        finally:
+            client.disconnect()
+            for http_server in servers:
+                http_server.shutdown()
@@ -0,0 +1,144 @@
+
+import fakeredis
+import pytest
+from app.sessions import (
+    BROADCASTER, MAX_SNAPSHOT_FALLACIES, VIEWER, RedisSessionRegistry, SessionRegistry,
+    create_session_registry
+)
+
+
+class TestSessionRegistry:
+    """Tests for SessionRegistry"""
+    
+    def test_join_roles(self):
+        """Test broadcaster and viewers are tracked per session"""
+        registry = SessionRegistry()
+        registry.join("room", "b", BROADCASTER)
+        registry.join("room", "v1", VIEWER)
+        assert registry.membership("b") == {"session_id": "room", "role": BROADCASTER}
+        assert registry.membership("v1") == {"session_id": "room", "role": VIEWER}
+        assert registry.membership("other") is None
+    
+    def test_single_broadcaster(self):
+        """Test a second broadcaster is rejected"""
+        registry = SessionRegistry()
+        registry.join("room", "b1", BROADCASTER)
+        with pytest.raises(ValueError):
+            registry.join("room", "b2", BROADCASTER)
+    
+    def test_invalid_role(self):
+        """Test unknown roles are rejected"""
+        with pytest.raises(ValueError):
+            SessionRegistry().join("room", "x", "admin")
+    
+    def test_session_removed_when_empty(self):
+        """Test a session is dropped once its last member leaves"""
+        registry = SessionRegistry()
+        registry.join("room", "b", BROADCASTER)
+        registry.join("room", "v", VIEWER)
+        assert registry.leave("b") == "room"
+        assert registry.snapshot("room") is not None
+        registry.leave("v")
+        assert registry.snapshot("room") is None
+    
+    def test_switching_sessions(self):
+        """Test joining another session leaves the previous one"""
+        registry = SessionRegistry()
+        registry.join("a", "c", VIEWER)
+        registry.join("b", "c", VIEWER)
+        assert registry.membership("c")["session_id"] == "b"
+        assert registry.snapshot("a") is None
+    
+    def test_analyze_once(self):
+        """Test the same text is claimed for analysis only once"""
+        registry = SessionRegistry()
+        registry.join("room", "b", BROADCASTER)
+        assert registry.begin_analysis("room", "Some text") is True
+        assert registry.begin_analysis("room", "Some text") is False
+        registry.record_result("room", "Some text", [])
+        assert registry.begin_analysis("room", "Some text") is False
+        assert registry.begin_analysis("room", "Some text, continued") is True
+    
+    def test_abandon_allows_retry(self):
+        """Test a failed analysis can be retried"""
+        registry = SessionRegistry()
+        registry.join("room", "b", BROADCASTER)
+        registry.begin_analysis("room", "Some text")
+        registry.abandon_analysis("room", "Some text")
+        assert registry.begin_analysis("room", "Some text") is True
+    
+    def test_snapshot_keeps_latest_result(self):
+        """Test the snapshot holds the result for the latest transcript only"""
+        registry = SessionRegistry()
+        registry.join("room", "b", BROADCASTER)
+        fallacy = {"type": "ad_hominem", "text_span": "you're an idiot"}
+        registry.record_result("room", "First", [fallacy])
+        registry.record_result("room", "First and second", [fallacy, {"type": "strawman", "text_span": "so you say"}])
+        
+        snapshot = registry.snapshot("room")
+        assert snapshot["text"] == "First and second"
+        assert snapshot["analyses"] == 2
+        assert snapshot["has_fallacies"] is True
+        assert [f["type"] for f in snapshot["fallacies"]] == ["ad_hominem", "strawman"]
+    
+    def test_concurrent_analyses_keep_newest_text(self):
+        """Test an older text finishing last does not replace the newer result"""
+        registry = SessionRegistry()
+        registry.join("room", "b", BROADCASTER)
+        assert registry.begin_analysis("room", "First and second") is True
+        assert registry.record_result("room", "First and second", [{"type": "strawman"}]) is True
+        assert registry.record_result("room", "First", []) is False
+        
+        snapshot = registry.snapshot("room")
+        assert snapshot["text"] == "First and second"
+        assert [f["type"] for f in snapshot["fallacies"]] == ["strawman"]
+    
+    def test_snapshot_fallacies_capped(self):
+        """Test the snapshot never holds more than MAX_SNAPSHOT_FALLACIES entries"""
+        registry = SessionRegistry()
+        registry.join("room", "b", BROADCASTER)
+        registry.record_result("room", "Long text", [{"type": "x"}] * (MAX_SNAPSHOT_FALLACIES + 10))
+        assert len(registry.snapshot("room")["fallacies"]) == MAX_SNAPSHOT_FALLACIES
+
+
+class TestRedisSessionRegistry:
+    """Tests for RedisSessionRegistry, with one registry per simulated worker"""
+    
+    @pytest.fixture
+    def workers(self):
+        server = fakeredis.FakeServer()
+        return [RedisSessionRegistry("redis://unused", client=fakeredis.FakeRedis(server=server))
+                for _ in range(2)]
+    
+    def test_session_shared_across_workers(self, workers):
+        """Test a broadcaster and viewer on different workers share one session"""
+        worker_a, worker_b = workers
+        worker_a.join("room", "b", BROADCASTER)
+        worker_b.join("room", "v", VIEWER)
+        assert worker_b.membership("b") == {"session_id": "room", "role": BROADCASTER}
+        with pytest.raises(ValueError):
+            worker_b.join("room", "b2", BROADCASTER)
+        
+        assert worker_a.begin_analysis("room", "Some text") is True
+        assert worker_b.begin_analysis("room", "Some text") is False
+        worker_a.record_result("room", "Some text", [{"type": "strawman"}])
+        snapshot = worker_b.snapshot("room")
+        assert snapshot["text"] == "Some text"
+        assert snapshot["viewers"] == 1
+        assert snapshot["fallacies"] == [{"type": "strawman"}]
+    
+    def test_session_removed_when_empty(self, workers):
+        """Test the session key is deleted once its last member leaves"""
+        worker_a, worker_b = workers
+        worker_a.join("room", "b", BROADCASTER)
+        worker_b.join("room", "v", VIEWER)
+        assert worker_a.leave("b") == "room"
+        assert worker_b.leave("v") == "room"
+        assert worker_a.snapshot("room") is None
+        assert worker_a.membership("v") is None
+    
+    def test_create_session_registry(self):
+        """Test Redis URLs select the shared registry and anything else the in-process one"""
+        assert type(create_session_registry(None)) is SessionRegistry
+        assert type(create_session_registry("file:///tmp/queue")) is SessionRegistry
+        assert isinstance(create_session_registry("redis://localhost:6379/0"), RedisSessionRegistry)
@@ -0,0 +1,219 @@
+
+import time
+import asyncio
+import threading
+from app.logging_config import trace_id_var
+from app.models import Fallacy
+from app.speculative import SpeculativeAnalyzer, shift_fallacy, stable_prefix
+
+
+class FakeDetector:
+    """Records analyzed texts; flags "idiot" as ad hominem"""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+    
+    async def detect_fallacies(self, text):
+        self.calls.append(text)
+        await asyncio.sleep(self.delay)
+        fallacies = []
+        if "idiot" in text:
+            start = text.index("idiot")
+            fallacies.append(Fallacy(type="ad_hominem", name="Ad Hominem", severity="high",
+                                     confidence=0.9, explanation="Attack", text_span="idiot",
+                                     start_index=start, end_index=start + 5))
+        return {"has_fallacies": bool(fallacies), "fallacies": fallacies, "confidence": 0.8}
+
+
+def make_analyzer(detector):
+    """Analyzer whose workers are queued for the test to run explicitly"""
+    tasks = []
+    analyzer = SpeculativeAnalyzer(detector, start_task=lambda target, *args: tasks.append((target, args)),
+                                   sleep=lambda seconds: None)
+    return analyzer, tasks
+
+
+class TestStablePrefix:
+    """Tests for stable_prefix"""
+    
+    def test_up_to_last_sentence(self):
+        """Test the prefix ends at the last complete sentence"""
+        assert stable_prefix("First point here. Second one! And then the") == "First point here. Second one!"
+    
+    def test_no_sentence_break(self):
+        """Test text without a finished sentence has no stable prefix"""
+        assert stable_prefix("still talking about it") == ""
+        assert stable_prefix("Version 2.5 is out") == ""
+    
+    def test_too_short(self):
+        """Test prefixes shorter than the detector minimum are ignored"""
+        assert stable_prefix("Yes. and so") == ""
+
+
+class TestShiftFallacy:
+    """Tests for shift_fallacy"""
+    
+    def test_shift_model_and_dict(self):
+        """Test indices move for models and dicts and missing indices stay None"""
+        fallacy = Fallacy(type="x", name="X", severity="low", confidence=0.5, explanation="",
+                          text_span="y", start_index=2, end_index=4)
+        shifted = shift_fallacy(fallacy, 10)
+        assert (shifted.start_index, shifted.end_index) == (12, 14)
+        assert fallacy.start_index == 2
+        assert shift_fallacy({"start_index": 1, "end_index": None}, 5) == {"start_index": 6, "end_index": None}
+
+
+class TestSpeculativeAnalyzer:
+    """Tests for SpeculativeAnalyzer"""
+    
+    def test_final_reuses_speculative_prefix(self):
+        """Test the final text only analyzes the tail after a speculated prefix"""
+        detector = FakeDetector()
+        analyzer, tasks = make_analyzer(detector)
+        
+        assert analyzer.propose("sid", "You are an idiot. But the plan") == "You are an idiot."
+        # Further interim updates with the same stable prefix do not start more work
+        assert analyzer.propose("sid", "You are an idiot. But the plan is") is None
+        assert len(tasks) == 1
+        target, args = tasks[0]
+        target(*args)
+        assert detector.calls == ["You are an idiot."]
+        
+        final = "You are an idiot. But the plan is fine, idiot."
+        result = analyzer.analyze_final("sid", final)
+        assert detector.calls[1] == "But the plan is fine, idiot."
+        assert [(f.start_index, f.end_index) for f in result["fallacies"]] == [(11, 16), (40, 45)]
+        assert all(final[f.start_index:f.end_index] == "idiot" for f in result["fallacies"])
+        assert result["has_fallacies"] is True
+        assert analyzer.stats()["hits"] == 1
+    
+    def test_exact_match_needs_no_model_call(self):
+        """Test a final text equal to the speculated prefix is committed without analysis"""
+        detector = FakeDetector()
+        analyzer, tasks = make_analyzer(detector)
+        analyzer.propose("sid", "You are an idiot. ")
+        target, args = tasks[0]
+        target(*args)
+        
+        result = analyzer.analyze_final("sid", "You are an idiot.")
+        assert detector.calls == ["You are an idiot."]
+        assert len(result["fallacies"]) == 1
+    
+    def test_divergent_final_analyzed_in_full(self):
+        """Test a final text that does not start with the cached prefix is analyzed whole"""
+        detector = FakeDetector()
+        analyzer, tasks = make_analyzer(detector)
+        analyzer.propose("sid", "You are an idiot. But")
+        target, args = tasks[0]
+        target(*args)
+        
+        analyzer.analyze_final("sid", "You are a genius. But the plan is fine.")
+        assert detector.calls[-1] == "You are a genius. But the plan is fine."
+        assert analyzer.stats()["misses"] == 1
+    
+    def test_finals_without_speculation_analyzed_in_full(self):
+        """Test final results are not cached, so clients that never speculate keep full context"""
+        detector = FakeDetector()
+        analyzer, _ = make_analyzer(detector)
+        analyzer.analyze_final("sid", "The first sentence is here.")
+        analyzer.analyze_final("sid", "The first sentence is here. Then an idiot spoke.")
+        assert detector.calls == ["The first sentence is here.",
+                                  "The first sentence is here. Then an idiot spoke."]
+    
+    def test_short_tail_analyzed_with_prefix(self):
+        """Test a tail too short for the detector is analyzed together with its prefix"""
+        detector = FakeDetector()
+        analyzer, tasks = make_analyzer(detector)
+        analyzer.propose("sid", "The plan has real merit. Idi")
+        target, args = tasks[0]
+        target(*args)
+        
+        result = analyzer.analyze_final("sid", "The plan has real merit. Idiots.")
+        assert detector.calls[-1] == "The plan has real merit. Idiots."
+        assert analyzer.stats()["misses"] == 1
+        assert result["has_fallacies"] is False
+    
+    def test_speculation_after_reset_replaces_cache(self):
+        """Test a new, shorter transcript's speculation replaces a longer cached one"""
+        detector = FakeDetector()
+        analyzer, tasks = make_analyzer(detector)
+        for interim in ("The first talk went on for quite a while. More", "New talk, you idiot. And"):
+            analyzer.propose("sid", interim)
+            target, args = tasks.pop()
+            target(*args)
+        
+        analyzer.analyze_final("sid", "New talk, you idiot. And the plan is fine.")
+        assert detector.calls[-1] == "And the plan is fine."
+        assert analyzer.stats()["hits"] == 1
+    
+    def test_worker_logs_carry_trace_id(self):
+        """Test speculative work runs under the trace ID of the interim update"""
+        seen = []
+        
+        class TracingDetector(FakeDetector):
+            async def detect_fallacies(self, text):
+                seen.append(trace_id_var.get())
+                return await super().detect_fallacies(text)
+        
+        analyzer, tasks = make_analyzer(TracingDetector())
+        token = trace_id_var.set("interim-1")
+        try:
+            analyzer.propose("sid", "You are an idiot. But")
+        finally:
+            trace_id_var.reset(token)
+        target, args = tasks[0]
+        worker = threading.Thread(target=target, args=args)
+        worker.start()
+        worker.join(timeout=5)
+        assert seen == ["interim-1"]
+    
+    def test_divergence_cancels_running_work(self):
+        """Test in-flight speculation is cancelled when interim text diverges from it"""
+        detector = FakeDetector(delay=5.0)
+        analyzer, tasks = make_analyzer(detector)
+        analyzer.propose("sid", "You are an idiot. But")
+        target, args = tasks[0]
+        worker = threading.Thread(target=target, args=args, daemon=True)
+        started = time.monotonic()
+        worker.start()
+        
+        deadline = time.monotonic() + 5
+        while not detector.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        analyzer.propose("sid", "You are a genius")
+        worker.join(timeout=5)
+        
+        assert not worker.is_alive()
+        assert time.monotonic() - started < 4
+        assert analyzer.stats()["cancelled"] == 1
+        # Nothing was cached, so the final is analyzed in full
+        detector.delay = 0.0
+        analyzer.analyze_final("sid", "You are a genius after all.")
+        assert detector.calls[-1] == "You are a genius after all."
+    
+    def test_final_waits_for_matching_speculation(self):
+        """Test a final text reuses speculation that is still in flight for its prefix"""
+        detector = FakeDetector(delay=0.2)
+        analyzer, tasks = make_analyzer(detector)
+        analyzer.propose("sid", "You are an idiot. But")
+        target, args = tasks[0]
+        worker = threading.Thread(target=target, args=args, daemon=True)
+        worker.start()
+        
+        deadline = time.monotonic() + 5
+        while not detector.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        analyzer.analyze_final("sid", "You are an idiot. But the plan is fine.")
+        worker.join(timeout=5)
+        assert detector.calls == ["You are an idiot.", "But the plan is fine."]
+    
+    def test_discard(self):
+        """Test a disconnected client's state is dropped"""
+        detector = FakeDetector()
+        analyzer, tasks = make_analyzer(detector)
+        analyzer.propose("sid", "You are an idiot. But")
+        analyzer.discard("sid")
+        target, args = tasks[0]
+        target(*args)
+        assert detector.calls == []
@@ -0,0 +1,34 @@
+
+import pytest
+from app.workers import DEFAULT_MESSAGE_QUEUE, resolve_message_queue, resolve_worker_count, worker_env
+
+
+class TestWorkers:
+    """Tests for multi-process worker configuration"""
+    
+    def test_resolve_worker_count(self):
+        """Test explicit counts, defaults and auto"""
+        assert resolve_worker_count(None) == 1
+        assert resolve_worker_count("4") == 4
+        assert resolve_worker_count("0") == 1
+        assert resolve_worker_count("auto") >= 1
+    
+    def test_resolve_worker_count_invalid(self):
+        """Test invalid values raise ValueError"""
+        with pytest.raises(ValueError):
+            resolve_worker_count("many")
+    
+    def test_worker_env(self):
+        """Test each worker gets its own port and the shared queue"""
+        env = worker_env(2, 8000, "file:///tmp/queue")
+        assert env["PORT"] == "8002"
+        assert env["WORKERS"] == "1"
+        assert env["WORKER_INDEX"] == "2"
+        assert env["FLASK_DEBUG"] == "false"
+        assert env["SOCKETIO_MESSAGE_QUEUE"] == "file:///tmp/queue"
+    
+    def test_resolve_message_queue(self):
+        """Test workers default to a local Redis when no shared queue is configured"""
+        assert resolve_message_queue(None) == DEFAULT_MESSAGE_QUEUE
+        assert resolve_message_queue("memory://") == DEFAULT_MESSAGE_QUEUE
+        assert resolve_message_queue("redis://redis:6379/0") == "redis://redis:6379/0"
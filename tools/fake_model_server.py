@@ -0,0 +1,135 @@
+"""Fake model server for load testing.
+
+Speaks just enough of the Ollama (/api/chat, /api/generate) and
+OpenAI-compatible (/v1/chat/completions) APIs for FallacyDetector, answering
+after a configurable delay so the backend can be load tested without a GPU.
+
+    python -m tools.fake_model_server --port 11500 --latency 0.8 --jitter 0.3
+
+Then start the backend with LOCAL_API_BASE=http://localhost:11500.
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+
+NO_FALLACIES = {
+    "has_fallacies": False,
+    "fallacies": [],
+    "confidence": 0.1,
+    "analysis": "No fallacies found"
+}
+
+AD_HOMINEM = {
+    "has_fallacies": True,
+    "fallacies": [
+        {
+            "type": "ad_hominem",
+            "name": "Ad Hominem",
+            "severity": "medium",
+            "confidence": 0.8,
+            "explanation": "Attacks the speaker rather than the argument",
+            "text_span": "",
+            "start_index": None,
+            "end_index": None
+        }
+    ],
+    "confidence": 0.8,
+    "analysis": "Found one fallacy"
+}
+
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    """Request handler; behaviour is configured on the server instance"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep the load test output readable
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            payload = {}
+
+        server = self.server
+        with server.stats_lock:
+            server.requests += 1
+
+        if self.path == "/api/generate":
+            # Warm-up probe: answer immediately
+            return self._send({"model": payload.get("model"), "response": "pong", "done": True})
+
+        time.sleep(max(0.0, random.gauss(server.latency, server.jitter)))
+        content = json.dumps(AD_HOMINEM if random.random() < server.fallacy_rate else NO_FALLACIES)
+
+        if self.path == "/api/chat":
+            return self._send({
+                "model": payload.get("model"),
+                "message": {"role": "assistant", "content": content},
+                "done": True
+            })
+        if self.path == "/v1/chat/completions":
+            return self._send({
+                "model": payload.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]
+            })
+        self._send({"error": f"Unknown path {self.path}"}, status=404)
+
+    def _send(self, body: Dict[str, Any], status: int = 200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def create_server(host: str = "127.0.0.1", port: int = 11500, latency: float = 0.5,
+                  jitter: float = 0.1, fallacy_rate: float = 0.2) -> ThreadingHTTPServer:
+    """Create (but do not start) a fake model server"""
+    server = ThreadingHTTPServer((host, port), FakeModelHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.fallacy_rate = fallacy_rate
+    server.requests = 0
+    server.stats_lock = threading.Lock()
+    return server
+
+
+def start_in_thread(**kwargs) -> ThreadingHTTPServer:
+    """Start a fake model server on a daemon thread and return it"""
+    server = create_server(**kwargs)
+    threading.Thread(target=server.serve_forever, name="fake-model-server", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Ollama/OpenAI-compatible model server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Standard deviation of the latency")
+    parser.add_argument("--fallacy-rate", type=float, default=0.2, help="Fraction of responses containing a fallacy")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port, args.latency, args.jitter, args.fallacy_rate)
+    print(f"Fake model server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
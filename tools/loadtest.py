@@ -0,0 +1,341 @@
+"""End-to-end Socket.IO load generator.
+
+Opens N Socket.IO clients against the backend, each replaying a transcript
+at a realistic speaking rate the way AnalysisPage.tsx does: the transcript
+grows word by word and the whole transcript is sent once it has been stable
+for 3 seconds. Concurrency is ramped in stages and each stage reports
+send -> fallacy_detection latency, error and drop rates, and the server's
+thread count and memory (from /api/stats).
+
+    # Everything local: fake model server + backend spawned for you
+    python -m tools.loadtest --spawn-backend --ramp 1,4,16,32 --stage-seconds 60
+
+    # Against an already running backend
+    python -m tools.loadtest --url http://localhost:8000 --ramp 1,2,4,8 corpus.txt
+
+Corpus files are either plain text (one transcript per paragraph) or JSONL
+with a "text" field per line.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import signal
+import argparse
+import threading
+import subprocess
+from typing import Dict, List, Optional, Tuple, Any
+
+import requests
+import socketio
+
+DEBOUNCE_SECONDS = 3.0  # Matches the silence timeout in AnalysisPage.tsx
+MIN_TEXT_LENGTH = 10  # AnalysisPage.tsx does not send shorter transcripts
+
+DEFAULT_CORPUS = [
+    "I think we should invest more in public transit. Everyone I know agrees with me, "
+    "so it must be the right call. If we don't do it now, the whole city will grind to a halt "
+    "and nobody will ever be able to get to work again.",
+    "My opponent says taxes should go up, but he has never run a business in his life. "
+    "Why would anyone listen to him? Either we cut taxes or the economy collapses.",
+    "The study followed two thousand participants over ten years. Those who exercised regularly "
+    "reported better sleep, although the authors note that the effect size was modest "
+    "and other factors may explain part of the difference.",
+    "Ever since the new mayor took office crime has gone up, so clearly the mayor caused it. "
+    "A famous actor also said the policy was a disaster, which proves the point.",
+]
+
+
+def load_corpus(paths: List[str]) -> List[str]:
+    """Load transcripts from .txt (blank-line separated) or .jsonl files"""
+    transcripts = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        text = json.loads(line).get("text", "")
+                        if text.strip():
+                            transcripts.append(text.strip())
+            else:
+                for paragraph in f.read().split("\n\n"):
+                    if paragraph.strip():
+                        transcripts.append(" ".join(paragraph.split()))
+    return transcripts
+
+
+def build_send_schedule(transcript: str, wpm: float, debounce: float = DEBOUNCE_SECONDS,
+                        pause_range: Tuple[float, float] = (0.3, 4.0),
+                        rng: Optional[random.Random] = None) -> List[Tuple[float, str]]:
+    """Return (seconds_from_start, text) pairs at which the frontend would send
+
+    Words arrive every 60/wpm seconds, with a random pause after each sentence.
+    Like AnalysisPage.tsx, the full transcript so far is sent whenever it has
+    not changed for `debounce` seconds, and only if it differs from the last send.
+    """
+    rng = rng or random.Random()
+    words = transcript.split()
+    word_interval = 60.0 / wpm
+    schedule = []
+    spoken = []
+    last_sent = ""
+    now = 0.0
+
+    for i, word in enumerate(words):
+        spoken.append(word)
+        is_last = i == len(words) - 1
+        gap = word_interval
+        if word[-1:] in ".?!":
+            gap += rng.uniform(*pause_range)
+        if is_last or gap >= debounce:
+            text = " ".join(spoken)
+            if len(text) >= MIN_TEXT_LENGTH and text != last_sent:
+                schedule.append((round(now + debounce, 3), text))
+                last_sent = text
+        now += gap
+
+    return schedule
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for an empty list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class SpeakerClient(threading.Thread):
+    """One simulated speaker: a Socket.IO client replaying transcripts until stopped"""
+
+    def __init__(self, url: str, corpus: List[str], wpm: float, stop_event: threading.Event,
+                 seed: Optional[int] = None):
+        super().__init__(daemon=True)
+        self.url = url
+        self.corpus = corpus
+        self.wpm = wpm
+        self.stop_event = stop_event
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.pending: Dict[str, float] = {}
+        self.latencies: List[float] = []
+        self.sent = 0
+        self.errors = 0
+        self.connect_failed = False
+        self.sio = socketio.Client(reconnection=False)
+        # Failed analyses arrive as both an `error` event and a fallacy_detection
+        # carrying "error"; only the latter is counted. Requests the server
+        # rejects without a result stay pending and are reported as dropped.
+        self.sio.on("fallacy_detection", self._on_detection)
+
+    def _on_detection(self, data):
+        received = time.monotonic()
+        with self.lock:
+            sent_at = self.pending.pop(data.get("trace_id"), None)
+            if sent_at is not None:
+                self.latencies.append(received - sent_at)
+            if data.get("error"):
+                self.errors += 1
+
+    def run(self):
+        try:
+            self.sio.connect(self.url, wait_timeout=20)
+        except Exception:
+            self.connect_failed = True
+            return
+
+        message_number = 0
+        while not self.stop_event.is_set():
+            transcript = self.rng.choice(self.corpus)
+            # Per-speaker rate varies around the target like real speakers do
+            wpm = max(60.0, self.rng.gauss(self.wpm, self.wpm * 0.1))
+            started = time.monotonic()
+            for offset, text in build_send_schedule(transcript, wpm, rng=self.rng):
+                if self.stop_event.wait(max(0.0, started + offset - time.monotonic())):
+                    return
+                message_number += 1
+                trace_id = f"{id(self):x}-{message_number}"
+                with self.lock:
+                    self.pending[trace_id] = time.monotonic()
+                    self.sent += 1
+                try:
+                    self.sio.emit("message", {"type": "text", "text": text, "trace_id": trace_id})
+                except Exception:
+                    with self.lock:
+                        self.pending.pop(trace_id, None)
+                        self.errors += 1
+
+    def close(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+
+def fetch_server_stats(url: str) -> Optional[Dict[str, Any]]:
+    """Fetch /api/stats from the backend, or None if unavailable"""
+    try:
+        response = requests.get(f"{url}/api/stats", timeout=5)
+        response.raise_for_status()
+        return response.json()
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def run_stage(url: str, clients: int, duration: float, corpus: List[str], wpm: float,
+              response_timeout: float, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Run `clients` concurrent speakers for `duration` seconds and collect metrics"""
+    stop_event = threading.Event()
+    speakers = [
+        SpeakerClient(url, corpus, wpm, stop_event, seed=None if seed is None else seed + i)
+        for i in range(clients)
+    ]
+    peak = {"threads": 0, "rss_bytes": 0}
+    sampling = threading.Event()
+
+    def sample_stats():
+        while not sampling.wait(1.0):
+            server_stats = fetch_server_stats(url)
+            if server_stats:
+                peak["threads"] = max(peak["threads"], server_stats.get("threads") or 0)
+                peak["rss_bytes"] = max(peak["rss_bytes"], server_stats.get("rss_bytes") or 0)
+
+    sampler = threading.Thread(target=sample_stats, daemon=True)
+    sampler.start()
+    for speaker in speakers:
+        speaker.start()
+
+    time.sleep(duration)
+    stop_event.set()
+
+    # Give in-flight requests a chance to complete before counting drops
+    deadline = time.monotonic() + response_timeout
+    while time.monotonic() < deadline and any(s.pending for s in speakers):
+        time.sleep(0.2)
+    sampling.set()
+    for speaker in speakers:
+        speaker.close()
+        speaker.join(timeout=5)
+
+    latencies = [latency for s in speakers for latency in s.latencies]
+    sent = sum(s.sent for s in speakers)
+    dropped = sum(len(s.pending) for s in speakers)
+    errors = sum(s.errors for s in speakers)
+    return {
+        "clients": clients,
+        "connect_failures": sum(1 for s in speakers if s.connect_failed),
+        "sent": sent,
+        "received": len(latencies),
+        "errors": errors,
+        "dropped": dropped,
+        "error_rate": errors / sent if sent else 0.0,
+        "drop_rate": dropped / sent if sent else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "latency_max": max(latencies) if latencies else None,
+        "server_threads_peak": peak["threads"],
+        "server_rss_mb_peak": round(peak["rss_bytes"] / (1024 * 1024), 1),
+    }
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    """Render stage results as a fixed-width table"""
+    def fmt(value):
+        return "-" if value is None else f"{value:.2f}"
+
+    header = (f"{'clients':>7} {'sent':>6} {'recv':>6} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+              f"{'max s':>7} {'err %':>6} {'drop %':>6} {'threads':>7} {'rss MB':>7}")
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['clients']:>7} {r['sent']:>6} {r['received']:>6} {fmt(r['latency_p50']):>7} "
+            f"{fmt(r['latency_p95']):>7} {fmt(r['latency_p99']):>7} {fmt(r['latency_max']):>7} "
+            f"{r['error_rate'] * 100:>6.1f} {r['drop_rate'] * 100:>6.1f} "
+            f"{r['server_threads_peak']:>7} {r['server_rss_mb_peak']:>7}"
+        )
+    return "\n".join(lines)
+
+
+def spawn_backend(port: int, model_base: str) -> subprocess.Popen:
+    """Start main.py against the fake model server in its own process group"""
+    env = dict(os.environ, PORT=str(port), LOCAL_API_BASE=model_base, USE_OLLAMA="true",
+               MODEL_WARMUP_INTERVAL="5", LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen([sys.executable, "main.py"], cwd=root, env=env, start_new_session=True)
+
+
+def wait_until_ready(url: str, timeout: float = 60.0) -> bool:
+    """Poll /api/ready until the backend reports a warm model"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{url}/api/ready", timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Socket.IO load generator replaying speech cadence")
+    parser.add_argument("corpus", nargs="*", help="Transcript files (.txt or .jsonl); built-in samples if omitted")
+    parser.add_argument("--url", default="http://localhost:8000", help="Backend base URL")
+    parser.add_argument("--ramp", default="1,2,4,8,16", help="Comma-separated client counts, one stage each")
+    parser.add_argument("--stage-seconds", type=float, default=60.0, help="Duration of each stage")
+    parser.add_argument("--wpm", type=float, default=150.0, help="Mean speaking rate in words per minute")
+    parser.add_argument("--response-timeout", type=float, default=60.0,
+                        help="Seconds to wait for outstanding results after each stage")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible cadence")
+    parser.add_argument("--json", dest="json_path", help="Also write stage results to this JSON file")
+    parser.add_argument("--spawn-backend", action="store_true",
+                        help="Start a fake model server and main.py locally instead of using --url")
+    parser.add_argument("--backend-port", type=int, default=8765)
+    parser.add_argument("--model-port", type=int, default=11500)
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Fake model mean latency (s)")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus) if args.corpus else DEFAULT_CORPUS
+    if not corpus:
+        parser.error("Corpus is empty")
+    stages = [int(n) for n in args.ramp.split(",") if n.strip()]
+
+    url = args.url.rstrip("/")
+    backend = None
+    if args.spawn_backend:
+        from tools.fake_model_server import start_in_thread
+        start_in_thread(port=args.model_port, latency=args.model_latency)
+        backend = spawn_backend(args.backend_port, f"http://127.0.0.1:{args.model_port}")
+        url = f"http://127.0.0.1:{args.backend_port}"
+
+    try:
+        if not wait_until_ready(url):
+            print(f"Backend at {url} did not become ready", file=sys.stderr)
+            return 1
+
+        results = []
+        for clients in stages:
+            print(f"Stage: {clients} client(s) for {args.stage_seconds:.0f}s...", file=sys.stderr)
+            results.append(run_stage(url, clients, args.stage_seconds, corpus, args.wpm,
+                                     args.response_timeout, seed=args.seed))
+            print(format_report(results[-1:]).splitlines()[-1], file=sys.stderr)
+
+        print(format_report(results))
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        return 0
+    finally:
+        if backend is not None:
+            os.killpg(backend.pid, signal.SIGTERM)
+            backend.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    sys.exit(main())